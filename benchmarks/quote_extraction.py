@@ -0,0 +1,91 @@
+"""
+Parse-time benchmark for the CNBC / FT quote scrapers.
+
+Compares the previous BeautifulSoup extraction against a full lxml parse and the
+early-stopping QuoteExtractor on the pages saved under benchmarks/fixtures/.
+
+    python benchmarks/quote_extraction.py [--runs 50]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lxml import etree
+from helpers.QuoteExtractor import cnbc_quote_strip, cnbc_bond_summary, ft_tearsheet_overview
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+fixtures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Fixture -> (extractor, the CSS selectors misterbot used with BeautifulSoup)
+cases = {
+    "cnbc_index.html": (cnbc_quote_strip, {
+        "price": ".QuoteStrip-lastPrice",
+        "change": ".QuoteStrip-lastPriceStripContainer > *:last-child > *:last-child"
+    }),
+    "cnbc_bond.html": (cnbc_bond_summary, {
+        "yield": ".QuoteStrip-lastPrice",
+        "price": "h3.Summary-title + ul > li.Summary-stat:nth-child(5) > span.Summary-value",
+        "previous_close": "h3.Summary-title + ul > li.Summary-stat:nth-child(8) > span.Summary-value"
+    }),
+    "ft_commodity.html": (ft_tearsheet_overview, {
+        "price": ".mod-tearsheet-overview__quote__bar > li:first-child .mod-ui-data-list__value",
+        "change": ".mod-tearsheet-overview__quote__bar > li:nth-child(2) .mod-ui-data-list__value"
+    })
+}
+
+def soup_extract(text, selectors):
+    soup = BeautifulSoup(text, "html.parser")
+    values = {}
+
+    for name, selector in selectors.items():
+        matches = soup.select(selector)
+        values[name] = str(matches[0].text).strip() if matches else None
+
+    return values
+
+def full_lxml_extract(text, extractor):
+    return extractor.evaluate(etree.fromstring(text, etree.HTMLParser()))
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argument_parser.add_argument("--runs", type=int, default=50)
+    args = argument_parser.parse_args()
+
+    print(f"{'fixture':<20} {'size':>8} {'method':<16} {'ms/parse':>9}")
+
+    for fixture, (extractor, selectors) in cases.items():
+        with open(os.path.join(fixtures_dir, fixture), encoding="utf-8") as fixture_file:
+            text = fixture_file.read()
+
+        methods = {
+            "lxml full parse": lambda: full_lxml_extract(text, extractor),
+            "lxml early stop": lambda: extractor.extract(text)
+        }
+
+        if BeautifulSoup is not None:
+            methods = {"bs4 html.parser": lambda: soup_extract(text, selectors), **methods}
+
+        expected = None
+
+        for method, run in methods.items():
+            values = run()
+
+            if expected is None:
+                expected = values
+            elif values != expected:
+                print(f"  {method} disagrees on {fixture}: {values} != {expected}")
+
+            seconds = min(timeit.repeat(run, number=1, repeat=args.runs))
+            print(f"{fixture:<20} {len(text) // 1024:>6}KB {method:<16} {seconds * 1000:>9.2f}")
+
+        print(f"{'':<20} {'':>8} {'values':<16} {expected}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import logging
+import re
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+class APIPreviewer:
+    bluesky_appview = "https://public.api.bsky.app/xrpc"
+
+    def __init__(self, http_client, timeout=5):
+        """
+        Link previews for sites with lightweight structured endpoints (YouTube oEmbed,
+        Bluesky's public AppView, fxtwitter), in the same format as the browser previews.
+        preview() returns None for other sites or when the endpoint fails, so the caller
+        can fall back to the browser.
+        """
+        self.http_client = http_client
+        self.timeout = timeout
+        self.extractors = [
+            (["youtube.com", "youtu.be"], self.preview_youtube),
+            (["bsky.app"], self.preview_bluesky),
+            (["fixupx.com", "fxtwitter.com", "x.com", "twitter.com"], self.preview_tweet),
+        ]
+
+    def extractor_for(self, url):
+        host = (urlparse(url).hostname or "").lower()
+
+        for domains, extractor in self.extractors:
+            if any(host == domain or host.endswith("." + domain) for domain in domains):
+                return extractor
+
+        return None
+
+    def preview(self, url):
+        extractor = self.extractor_for(url)
+
+        if extractor is None:
+            return None
+
+        try:
+            return extractor(url)
+        except Exception as e:
+            logger.debug(f"API preview failed for {url}: {str(e)}")
+            return None
+
+    def get_json(self, url, params=None):
+        response = self.http_client.get(url, params=params, timeout=self.timeout, revalidate=False)
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def clean(text):
+        return re.sub(r'\u200b', '', text.replace("\r", " ").replace("\n", " ")).strip()
+
+    def preview_youtube(self, url):
+        data = self.get_json("https://www.youtube.com/oembed", params={"url": url, "format": "json"})
+        title = self.clean(data.get("title", ""))
+        author = self.clean(data.get("author_name", ""))
+
+        if not title:
+            return None
+
+        return f"[ {title} - {author} ]" if author else f"[ {title} ]"
+
+    def preview_bluesky(self, url):
+        match = re.search(r"/profile/([^/]+)/post/([^/?#]+)", urlparse(url).path)
+
+        if match is None:
+            return None
+
+        actor, rkey = match.groups()
+
+        if not actor.startswith("did:"):
+            actor = self.get_json(f"{self.bluesky_appview}/com.atproto.identity.resolveHandle", params={"handle": actor})["did"]
+
+        thread = self.get_json(f"{self.bluesky_appview}/app.bsky.feed.getPostThread", params={
+            "uri": f"at://{actor}/app.bsky.feed.post/{rkey}",
+            "depth": 0,
+            "parentHeight": 0
+        })
+        post = thread["thread"]["post"]
+        author = post["author"]
+        name = self.clean(author.get("displayName") or author["handle"])
+        title = f"{name} (@{author['handle']})"
+        description = self.clean(post.get("record", {}).get("text", ""))
+
+        if not description:
+            return f"[ {title}: Check the Bluesky post for any attached media. ]"
+
+        return f"[ {title}: {description} ]"
+
+    def preview_tweet(self, url):
+        match = re.search(r"/([^/]+)/status/(\d+)", urlparse(url).path)
+
+        if match is None:
+            return None
+
+        screen_name, status_id = match.groups()
+        tweet = self.get_json(f"https://api.fxtwitter.com/{screen_name}/status/{status_id}")["tweet"]
+        author = tweet["author"]
+        title = f"{self.clean(author['name'])} (@{author['screen_name']})"
+        description = self.clean(tweet.get("text", ""))
+
+        if not description:
+            description = "Check the tweet for any attached media."
+
+        return f"[ {title}: {description} ]"
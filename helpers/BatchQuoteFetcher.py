@@ -0,0 +1,62 @@
+import logging
+import yfinance as yf
+from yfinance.data import YfData
+
+logger = logging.getLogger(__name__)
+
+class BatchQuoteFetcher:
+    quote_url = "https://query1.finance.yahoo.com/v7/finance/quote"
+
+    def fetch(self, symbols):
+        """
+        Retrieves price and previous close for every symbol in one upstream round trip.
+        Returns {"SYMBOL": {"symbol", "name", "price", "previous_close"}}; symbols Yahoo
+        has no data for are left out.
+        """
+        try:
+            return self.fetch_from_quote_endpoint(symbols)
+        except Exception as e:
+            logger.debug(f"Batch quote endpoint failed for {','.join(symbols)}, falling back to yf.download: {e}")
+            return self.fetch_from_download(symbols)
+
+    def fetch_from_quote_endpoint(self, symbols):
+        # YfData is yfinance's shared session, so the cookie/crumb handshake is reused
+        payload = YfData().get_raw_json(self.quote_url, params={"symbols": ",".join(symbols), "formatted": "false"})
+        records = {}
+
+        for result in payload.get("quoteResponse", {}).get("result", []):
+            price = result.get("regularMarketPrice")
+
+            if price is None:
+                continue
+
+            records[result["symbol"]] = {
+                "symbol": result["symbol"],
+                "name": result.get("longName") or result.get("shortName") or result["symbol"],
+                "price": price,
+                "previous_close": result.get("regularMarketPreviousClose"),
+            }
+
+        return records
+
+    def fetch_from_download(self, symbols):
+        history = yf.download(symbols, period="5d", interval="1d", group_by="ticker", auto_adjust=False, progress=False, threads=True)
+        records = {}
+
+        for symbol in symbols:
+            try:
+                closes = history[symbol]["Close"].dropna()
+            except KeyError:
+                continue
+
+            if len(closes) < 1:
+                continue
+
+            records[symbol] = {
+                "symbol": symbol,
+                "name": symbol,
+                "price": float(closes.iloc[-1]),
+                "previous_close": float(closes.iloc[-2]) if len(closes) > 1 else None,
+            }
+
+        return records
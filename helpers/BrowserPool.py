@@ -0,0 +1,146 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from urllib.parse import urlparse
+from playwright.sync_api import sync_playwright
+
+logger = logging.getLogger(__name__)
+
+class BrowserPool:
+    def __init__(self, size=2, max_pages_per_browser=50, per_domain_limit=2, context_options=None, launch_options=None):
+        """
+        Keeps a set of pre-launched headless Chromium instances warm for link previews.
+        Every render gets a fresh context and page; browsers are recycled after
+        max_pages_per_browser renders to keep renderer memory in check.
+
+        Playwright's sync API is bound to the thread that started it, so each browser
+        lives on its own worker thread and renders are queued to whichever is free.
+        """
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.per_domain_limit = per_domain_limit
+        self.context_options = context_options or (lambda: {})
+        self.launch_options = launch_options or {"headless": True}
+
+        self.jobs = queue.Queue()
+        self.domain_slots = {}  # Schema: {"example.com": {"semaphore": BoundedSemaphore, "users": renders holding or waiting}}
+        self.domain_lock = threading.Lock()
+
+        self.workers = []
+
+        for i in range(self.size):
+            worker = threading.Thread(target=self._worker, name=f"browser-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def _domain_slot(self, domain):
+        with self.domain_lock:
+            slot = self.domain_slots.get(domain)
+
+            if slot is None:
+                slot = self.domain_slots[domain] = {"semaphore": threading.BoundedSemaphore(self.per_domain_limit), "users": 0}
+
+            slot["users"] += 1
+            return slot["semaphore"]
+
+    def _release_domain_slot(self, domain, acquired=True):
+        with self.domain_lock:
+            slot = self.domain_slots[domain]
+
+            if acquired:
+                slot["semaphore"].release()
+
+            slot["users"] -= 1
+
+            # Nobody holds or waits on it, so drop it rather than keep one per domain ever previewed
+            if slot["users"] == 0:
+                del self.domain_slots[domain]
+
+    def render(self, url, callback, timeout=60):
+        """
+        Queues callback(context, page) on a warm browser and returns a Future with its result.
+        Blocks for up to `timeout` seconds if the domain already has per_domain_limit renders in flight.
+        """
+        future = Future()
+        domain = urlparse(url).netloc.replace('www.', '')
+        slot = self._domain_slot(domain)
+
+        if not slot.acquire(timeout=timeout):
+            self._release_domain_slot(domain, acquired=False)
+            future.set_exception(TimeoutError(f"Too many concurrent renders for {urlparse(url).netloc}"))
+            return future
+
+        future.add_done_callback(lambda _: self._release_domain_slot(domain))
+        self.jobs.put((future, callback))
+        return future
+
+    def _launch(self, playwright):
+        browser = playwright.chromium.launch(**self.launch_options)
+        logger.debug(f"{threading.current_thread().name}: launched Chromium {browser.version}")
+        return browser
+
+    def _worker(self):
+        try:
+            with sync_playwright() as p:
+                browser = None
+                pages_served = 0
+
+                while True:
+                    if browser is None or not browser.is_connected():
+                        try:
+                            browser = self._launch(p)
+                            pages_served = 0
+                        except Exception as e:
+                            logger.error(f"{threading.current_thread().name}: failed to launch Chromium: {e}")
+                            browser = None
+
+                    job = self.jobs.get()
+
+                    if job is None:
+                        break
+
+                    future, callback = job
+
+                    if not future.set_running_or_notify_cancel():
+                        continue
+
+                    if browser is None:
+                        future.set_exception(RuntimeError("No browser available to render page"))
+                        continue
+
+                    context = None
+
+                    try:
+                        context = browser.new_context(**self.context_options())
+                        page = context.new_page()
+                        future.set_result(callback(context, page))
+                    except Exception as e:
+                        future.set_exception(e)
+                    finally:
+                        pages_served += 1
+
+                        try:
+                            if context is not None:
+                                context.close()
+                        except Exception:
+                            pass
+
+                    if pages_served >= self.max_pages_per_browser:
+                        logger.debug(f"{threading.current_thread().name}: recycling Chromium after {pages_served} pages")
+
+                        try:
+                            browser.close()
+                        except Exception:
+                            pass
+
+                        browser = None
+
+                if browser is not None:
+                    browser.close()
+        except Exception as e:
+            logger.error(f"{threading.current_thread().name}: browser worker exited: {e}")
+
+    def shutdown(self):
+        for _ in self.workers:
+            self.jobs.put(None)
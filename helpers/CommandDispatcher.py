@@ -0,0 +1,104 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from helpers.OutboundQueue import OutboundQueue
+
+logger = logging.getLogger(__name__)
+
+class ReplyConnection:
+    def __init__(self, connection, outbound, max_lines=None):
+        """
+        Wraps an irc.client ServerConnection for one reply: messages are queued on the
+        connection's OutboundQueue (written later by the reactor thread) instead of going
+        straight to the socket. The first line of the reply is sent ahead of bulk output,
+        and the whole reply is capped at max_lines lines.
+        """
+        self._connection = connection
+        self._outbound = outbound
+        self._remaining_lines = max_lines
+        self._replied = False
+
+    def _enqueue(self, command, target, text):
+        if self._remaining_lines is not None and self._remaining_lines <= 0:
+            logger.debug(f"Reply line cap reached, dropping message to {target}")
+            return
+
+        queued = self._outbound.enqueue(command, target, text, interactive=not self._replied, max_lines=self._remaining_lines)
+
+        if self._remaining_lines is not None:
+            self._remaining_lines -= queued
+
+        self._replied = self._replied or queued > 0
+
+    def privmsg(self, target, text):
+        self._enqueue("privmsg", target, text)
+
+    def notice(self, target, text):
+        self._enqueue("notice", target, text)
+
+    def __getattr__(self, name):
+        # Everything else (nickname, reactor, etc.) is read straight off the real connection
+        return getattr(self._connection, name)
+
+class CommandDispatcher:
+    def __init__(self, max_workers=4, max_pending=16, outbound_options=None, max_reply_lines=10):
+        """
+        Runs command handlers on a bounded thread pool so the irc.client reactor
+        only has to parse messages and answer PINGs. Replies are paced through one
+        OutboundQueue per connection, built with outbound_options, and each reply is
+        capped at max_reply_lines lines.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="misterbot-worker")
+        self.outbound_options = outbound_options or {}
+        self.outbound_queues = {}
+        self.max_reply_lines = max_reply_lines
+
+        # Running plus queued jobs; anything beyond this is rejected instead of piling up
+        self.slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def outbound_queue(self, connection):
+        # The reactor mutex also guards its scheduler, which the queue registers its drain with
+        with connection.reactor.mutex:
+            outbound = self.outbound_queues.get(id(connection))
+
+            if outbound is None or outbound.connection is not connection:
+                outbound = OutboundQueue(connection, **self.outbound_options)
+                self.outbound_queues[id(connection)] = outbound
+
+        return outbound
+
+    def reply_connection(self, connection):
+        """A fresh ReplyConnection on the connection's shared outbound queue."""
+        return ReplyConnection(connection, self.outbound_queue(connection), max_lines=self.max_reply_lines)
+
+    def set_userhost(self, connection, userhost):
+        """Records our user@host as the server relays it, so lines are packed to the exact limit."""
+        self.outbound_queue(connection).packer.userhost = userhost
+
+    def submit(self, connection, handler, *args):
+        """
+        Queues handler(reply_connection, *args) on the pool.
+        Returns False when the pool is saturated and the job was not accepted.
+        """
+        if not self.slots.acquire(blocking=False):
+            return False
+
+        try:
+            self.executor.submit(self._run, handler, self.reply_connection(connection), *args)
+        except RuntimeError:
+            # Executor has been shut down (e.g. while reconnecting)
+            self.slots.release()
+            return False
+
+        return True
+
+    def _run(self, handler, connection, *args):
+        try:
+            handler(connection, *args)
+        except Exception as e:
+            logger.error(f"Unhandled exception in worker running {getattr(handler, '__name__', handler)}: {e}")
+        finally:
+            self.slots.release()
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,713 @@
+import html
+import logging
+import os
+import re
+import struct
+import zlib
+from datetime import datetime
+from urllib.parse import urlparse, unquote
+from xml.etree import ElementTree
+
+logger = logging.getLogger(__name__)
+
+PDF_CONTENT_TYPES = ["application/pdf", "application/x-pdf"]
+DOCX_CONTENT_TYPES = ["application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
+
+# Generic binary types some servers use for any download, documents included
+BINARY_CONTENT_TYPES = ["application/octet-stream", "binary/octet-stream"]
+
+class RemoteFile:
+    def __init__(self, http_client, url, timeout=10, max_full_bytes=16 * 1024 * 1024):
+        """
+        Random access to a remote file through HTTP Range requests, keeping every fetched
+        segment in memory. Servers that ignore Range get their whole body read once,
+        up to max_full_bytes.
+        """
+        self.http_client = http_client
+        self.url = url
+        self.timeout = timeout
+        self.max_full_bytes = max_full_bytes
+
+        self.size = None
+        self.content_type = ""
+        self.segments = []  # Schema: [(start offset, bytes)]
+        self.bytes_transferred = 0
+
+    def _request(self, byte_range):
+        # Offsets refer to the stored bytes, so ask for them without any content coding
+        response = self.http_client.get(self.url, headers={"Range": f"bytes={byte_range}", "Accept-Encoding": "identity"}, timeout=self.timeout, stream=True, revalidate=False)
+
+        try:
+            if response.status_code not in (200, 206):
+                raise IOError(f"HTTP {response.status_code} for {self.url}")
+
+            self.content_type = response.headers.get("content-type", self.content_type)
+
+            if response.status_code == 200 and self.content_type and not any(
+                document_type in self.content_type for document_type in PDF_CONTENT_TYPES + DOCX_CONTENT_TYPES + BINARY_CONTENT_TYPES
+            ):
+                # Not a document, so don't pull a whole page through a reader that can't use it
+                raise IOError(f"{self.url} is {self.content_type}, not a document")
+
+            content_range = re.match(r"bytes (\d+)-(\d+)/(\d+|\*)", response.headers.get("content-range", ""))
+
+            if response.status_code == 206 and content_range:
+                data = response.content
+
+                if content_range.group(3) != "*":
+                    self.size = int(content_range.group(3))
+
+                start = int(content_range.group(1))
+            else:
+                # Range was ignored: the only way forward is the whole body, within reason
+                chunks = []
+                received = 0
+
+                for chunk in response.iter_content(chunk_size=65536):
+                    chunks.append(chunk)
+                    received += len(chunk)
+
+                    if received > self.max_full_bytes:
+                        raise IOError(f"{self.url} ignores Range requests and is larger than {self.max_full_bytes} bytes")
+
+                data = b"".join(chunks)
+                self.size = len(data)
+                start = 0
+
+            self.bytes_transferred += len(data)
+            self.segments.append((start, data))
+            return start, data
+        finally:
+            response.close()
+
+    def tail(self, length):
+        if self.size is not None:
+            return self.read(max(0, self.size - length), min(length, self.size))
+
+        return self._request(f"-{length}")[1]
+
+    def read(self, start, length):
+        if self.size is not None:
+            length = max(0, min(length, self.size - start))
+
+        for segment_start, data in self.segments:
+            if segment_start <= start and start + length <= segment_start + len(data):
+                return data[start - segment_start:start - segment_start + length]
+
+        segment_start, data = self._request(f"{start}-{start + length - 1}")
+        return data[start - segment_start:start - segment_start + length]
+
+def read_dictionary(data, start):
+    """Returns the balanced << ... >> starting at data[start], or None if it runs past the buffer."""
+    depth = 0
+    i = start
+
+    while i < len(data):
+        if data[i:i + 2] == b"<<":
+            depth += 1
+            i += 2
+        elif data[i:i + 2] == b">>":
+            depth -= 1
+            i += 2
+
+            if depth == 0:
+                return data[start:i]
+        elif data[i:i + 1] == b"(":
+            i = skip_literal_string(data, i)
+        elif data[i:i + 1] == b"<":
+            i = data.find(b">", i) + 1 or len(data)
+        else:
+            i += 1
+
+    return None
+
+def skip_literal_string(data, start):
+    depth = 0
+    i = start
+
+    while i < len(data):
+        char = data[i:i + 1]
+
+        if char == b"\\":
+            i += 2
+            continue
+
+        if char == b"(":
+            depth += 1
+        elif char == b")":
+            depth -= 1
+
+            if depth == 0:
+                return i + 1
+
+        i += 1
+
+    return len(data)
+
+# Where PDFDocEncoding departs from Latin-1 (PDF 32000-1, Annex D)
+PDF_DOC_ENCODING = dict(zip(
+    list(range(0x80, 0x9F)) + [0xA0],
+    "\u2022\u2020\u2021\u2026\u2014\u2013\u0192\u2044\u2039\u203a\u2212\u2030\u201e\u201c\u201d\u2018"
+    "\u2019\u201a\u2122\ufb01\ufb02\u0141\u0152\u0160\u0178\u017d\u0131\u0142\u0153\u0161\u017e\u20ac"
+))
+
+def decode_text_string(raw):
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", errors="replace")
+    if raw.startswith(b"\xef\xbb\xbf"):
+        return raw[3:].decode("utf-8", errors="replace")
+
+    return "".join(PDF_DOC_ENCODING.get(byte, chr(byte)) for byte in raw)
+
+def decode_literal_string(body):
+    escapes = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f", b"(": b"(", b")": b")", b"\\": b"\\"}
+    output = bytearray()
+    i = 0
+
+    while i < len(body):
+        char = body[i:i + 1]
+
+        if char != b"\\":
+            output += char
+            i += 1
+            continue
+
+        following = body[i + 1:i + 2]
+
+        if following in escapes:
+            output += escapes[following]
+            i += 2
+        elif following in (b"\r", b"\n"):
+            # Line continuation
+            i += 2 + (body[i + 1:i + 3] == b"\r\n")
+        else:
+            octal = re.match(rb"[0-7]{1,3}", body[i + 1:i + 4])
+
+            if octal:
+                output.append(int(octal.group(0), 8) & 0xFF)
+                i += 1 + len(octal.group(0))
+            else:
+                i += 1
+
+    return bytes(output)
+
+class PDFInfoReader:
+    def __init__(self, remote, tail_bytes=65536):
+        """
+        Reads the document information dictionary (and the XMP dc:title as a fallback)
+        from a remote PDF: the trailer at the end of the file, then only the xref entries
+        and objects needed to reach /Info and /Metadata.
+        """
+        self.remote = remote
+        self.tail_bytes = tail_bytes
+        self.sections = []  # Trailer / xref stream dictionaries, newest first
+
+    def read(self):
+        tail = self.remote.tail(self.tail_bytes)
+        startxref = re.findall(rb"startxref\s+(\d+)", tail)
+
+        if not startxref:
+            return None
+
+        offset = int(startxref[-1])
+        seen = set()
+
+        while offset is not None and offset not in seen and len(seen) < 32:
+            seen.add(offset)
+            section = self.read_xref_section(offset)
+
+            if section is None:
+                break
+
+            self.sections.append(section)
+            previous = re.search(rb"/Prev\s+(\d+)", section["trailer"])
+            offset = int(previous.group(1)) if previous else None
+
+        if not self.sections:
+            return None
+
+        trailer = b" ".join(section["trailer"] for section in self.sections)
+
+        if re.search(rb"/Encrypt\b", self.sections[0]["trailer"]):
+            return None
+
+        metadata = {}
+        info_ref = re.search(rb"/Info\s+(\d+)\s+\d+\s+R", trailer)
+
+        if info_ref:
+            info = self.resolve(int(info_ref.group(1)))
+
+            if info:
+                for key in ["Title", "Author", "Subject", "Creator", "Producer", "CreationDate", "ModDate"]:
+                    value = self.dictionary_value(info, key)
+
+                    if value:
+                        metadata[key.lower()] = value
+
+        if not metadata.get("title"):
+            root_ref = re.search(rb"/Root\s+(\d+)\s+\d+\s+R", trailer)
+            xmp_title = self.read_xmp_title(int(root_ref.group(1))) if root_ref else None
+
+            if xmp_title:
+                metadata["title"] = xmp_title
+
+        return metadata
+
+    def read_xref_section(self, offset):
+        head = self.remote.read(offset, 4096)
+        keyword = re.match(rb"\s*xref", head)
+
+        if keyword:
+            trailer_at = head.find(b"trailer")
+            subsections = []
+            position = offset + keyword.end()
+            block = self.remote.read(position, 64)
+
+            # Walk the "first count" subsection headers, skipping over their fixed-width entries
+            while True:
+                header = re.match(rb"\s*(\d+)\s+(\d+)[ \t]*\r?\n?", block)
+
+                if header is None:
+                    break
+
+                first, count = int(header.group(1)), int(header.group(2))
+                entries_at = position + header.end()
+                subsections.append((first, count, entries_at))
+                position = entries_at + count * 20
+                block = self.remote.read(position, 64)
+
+            trailer_block = self.remote.read(position, 4096) if trailer_at < 0 else head
+            trailer_start = trailer_block.find(b"<<", trailer_block.find(b"trailer"))
+            trailer = read_dictionary(trailer_block, trailer_start) if trailer_start >= 0 else None
+
+            if trailer is None:
+                return None
+
+            return {"kind": "table", "subsections": subsections, "trailer": trailer}
+
+        stream = self.read_stream(head, offset)
+
+        if stream is None:
+            return None
+
+        dictionary, data = stream
+        widths = [int(width) for width in re.findall(rb"\d+", re.search(rb"/W\s*\[([^\]]*)\]", dictionary).group(1))]
+        size = int(re.search(rb"/Size\s+(\d+)", dictionary).group(1))
+        index = re.search(rb"/Index\s*\[([^\]]*)\]", dictionary)
+        index = [int(number) for number in re.findall(rb"\d+", index.group(1))] if index else [0, size]
+
+        return {
+            "kind": "stream",
+            "widths": widths,
+            "index": list(zip(index[0::2], index[1::2])),
+            "rows": data,
+            "trailer": dictionary
+        }
+
+    def read_stream(self, head, offset):
+        """Parses "N G obj << ... >> stream ... endstream" at offset into (dictionary, decoded data)."""
+        match = re.match(rb"\s*\d+\s+\d+\s+obj\s*", head)
+
+        if match is None or head[match.end():match.end() + 2] != b"<<":
+            return None
+
+        dictionary = read_dictionary(head, match.end())
+
+        if dictionary is None:
+            return None
+
+        stream_keyword = re.compile(rb"\s*stream\r?\n").match(head, match.end() + len(dictionary))
+
+        if stream_keyword is None:
+            return None
+
+        length = self.integer_value(dictionary, "Length")
+
+        if length is None:
+            return None
+
+        data = self.remote.read(offset + stream_keyword.end(), length)
+        return dictionary, self.decode_stream(dictionary, data)
+
+    def decode_stream(self, dictionary, data):
+        if re.search(rb"/Filter\s*\[?\s*/FlateDecode", dictionary):
+            data = zlib.decompress(data)
+        elif re.search(rb"/Filter\b", dictionary):
+            raise ValueError("Unsupported PDF stream filter")
+
+        predictor = re.search(rb"/Predictor\s+(\d+)", dictionary)
+
+        if predictor and int(predictor.group(1)) >= 10:
+            columns = re.search(rb"/Columns\s+(\d+)", dictionary)
+            data = self.undo_png_predictor(data, int(columns.group(1)) if columns else 1)
+
+        return data
+
+    @staticmethod
+    def undo_png_predictor(data, columns):
+        rows = []
+        previous = bytearray(columns)
+
+        for start in range(0, len(data) - columns, columns + 1):
+            filter_type = data[start]
+            row = bytearray(data[start + 1:start + 1 + columns])
+
+            for i in range(len(row)):
+                left = row[i - 1] if i > 0 else 0
+                up = previous[i]
+                upper_left = previous[i - 1] if i > 0 else 0
+
+                if filter_type == 1:
+                    row[i] = (row[i] + left) & 0xFF
+                elif filter_type == 2:
+                    row[i] = (row[i] + up) & 0xFF
+                elif filter_type == 3:
+                    row[i] = (row[i] + (left + up) // 2) & 0xFF
+                elif filter_type == 4:
+                    estimate = left + up - upper_left
+                    distances = (abs(estimate - left), abs(estimate - up), abs(estimate - upper_left))
+                    row[i] = (row[i] + (left, up, upper_left)[distances.index(min(distances))]) & 0xFF
+
+            rows.append(bytes(row))
+            previous = row
+
+        return b"".join(rows)
+
+    def locate(self, number):
+        """Returns ("offset", byte offset) or ("compressed", object stream number, index) for an object."""
+        for section in self.sections:
+            if section["kind"] == "table":
+                for first, count, entries_at in section["subsections"]:
+                    if first <= number < first + count:
+                        entry = self.remote.read(entries_at + (number - first) * 20, 20)
+                        fields = re.match(rb"(\d{10}) (\d{5}) ([nf])", entry)
+
+                        if fields and fields.group(3) == b"n":
+                            return ("offset", int(fields.group(1)))
+
+                        return None
+            else:
+                widths = section["widths"]
+                row_size = sum(widths)
+                row_number = 0
+
+                for first, count in section["index"]:
+                    if first <= number < first + count:
+                        row = section["rows"][(row_number + number - first) * row_size:(row_number + number - first + 1) * row_size]
+                        fields = []
+                        position = 0
+
+                        for width in widths:
+                            fields.append(int.from_bytes(row[position:position + width], "big") if width else None)
+                            position += width
+
+                        entry_type = fields[0] if fields[0] is not None else 1
+
+                        if entry_type == 1:
+                            return ("offset", fields[1])
+                        if entry_type == 2:
+                            return ("compressed", fields[1], fields[2])
+
+                        return None
+
+                    row_number += count
+
+        return None
+
+    def resolve(self, number):
+        """Raw bytes of object `number`'s value."""
+        location = self.locate(number)
+
+        if location is None:
+            return None
+
+        if location[0] == "offset":
+            head = self.remote.read(location[1], 8192)
+            match = re.match(rb"\s*\d+\s+\d+\s+obj\s*", head)
+
+            if match is None:
+                return None
+
+            if head[match.end():match.end() + 2] == b"<<":
+                return read_dictionary(head, match.end())
+
+            end = head.find(b"endobj", match.end())
+            return head[match.end():end if end >= 0 else len(head)].strip()
+
+        object_stream_location = self.locate(location[1])
+
+        if object_stream_location is None or object_stream_location[0] != "offset":
+            return None
+
+        stream = self.read_stream(self.remote.read(object_stream_location[1], 8192), object_stream_location[1])
+
+        if stream is None:
+            return None
+
+        dictionary, data = stream
+        first = self.integer_value(dictionary, "First")
+        count = self.integer_value(dictionary, "N")
+        pairs = [int(number) for number in re.findall(rb"\d+", data[:first])][:count * 2]
+        offsets = dict(zip(pairs[0::2], pairs[1::2]))
+
+        if number not in offsets:
+            return None
+
+        value = data[first + offsets[number]:].lstrip()
+
+        if value.startswith(b"<<"):
+            return read_dictionary(value, 0)
+
+        return value
+
+    def value_at(self, data):
+        """Decodes the string, number or indirect reference at the start of data."""
+        data = data.lstrip()
+
+        if data.startswith(b"("):
+            end = skip_literal_string(data, 0)
+            return decode_text_string(decode_literal_string(data[1:end - 1]))
+
+        if data.startswith(b"<") and not data.startswith(b"<<"):
+            hex_digits = re.sub(rb"\s", b"", data[1:data.find(b">")])
+
+            if len(hex_digits) % 2:
+                hex_digits += b"0"
+
+            return decode_text_string(bytes.fromhex(hex_digits.decode("ascii")))
+
+        reference = re.match(rb"(\d+)\s+\d+\s+R", data)
+
+        if reference:
+            resolved = self.resolve(int(reference.group(1)))
+            return self.value_at(resolved) if resolved and not re.match(rb"\d+\s+\d+\s+R", resolved) else None
+
+        number = re.match(rb"-?\d+", data)
+        return int(number.group(0)) if number else None
+
+    def dictionary_value(self, dictionary, key):
+        match = re.search(rb"/" + key.encode() + rb"(?=[\s(<\[/])", dictionary)
+
+        if match is None:
+            return None
+
+        value = self.value_at(dictionary[match.end():])
+        return value.replace("\x00", "").strip() if isinstance(value, str) else value
+
+    def integer_value(self, dictionary, key):
+        value = self.dictionary_value(dictionary, key)
+        return value if isinstance(value, int) else None
+
+    def read_xmp_title(self, root_number):
+        catalog = self.resolve(root_number)
+        metadata_ref = re.search(rb"/Metadata\s+(\d+)\s+\d+\s+R", catalog or b"")
+
+        if metadata_ref is None:
+            return None
+
+        location = self.locate(int(metadata_ref.group(1)))
+
+        if location is None or location[0] != "offset":
+            return None
+
+        stream = self.read_stream(self.remote.read(location[1], 8192), location[1])
+
+        if stream is None:
+            return None
+
+        xmp = stream[1].decode("utf-8", errors="replace")
+        title = re.search(r"<dc:title\b[^>]*>.*?<rdf:li[^>]*>(.*?)</rdf:li>", xmp, re.DOTALL)
+
+        if title is None:
+            return None
+
+        return re.sub(r"\s+", " ", html.unescape(title.group(1))).strip() or None
+
+class DOCXCoreReader:
+    namespaces = {
+        "cp": "http://schemas.openxmlformats.org/package/2006/metadata/core-properties",
+        "dc": "http://purl.org/dc/elements/1.1/",
+        "dcterms": "http://purl.org/dc/terms/"
+    }
+
+    def __init__(self, remote, tail_bytes=65536):
+        """
+        Reads docProps/core.xml from a remote DOCX: the ZIP end of central directory record
+        at the end of the file, the central directory, then only that one member.
+        """
+        self.remote = remote
+        self.tail_bytes = tail_bytes
+
+    def read(self):
+        tail = self.remote.tail(self.tail_bytes)
+        eocd_at = tail.rfind(b"PK\x05\x06")
+
+        if eocd_at < 0 or len(tail) < eocd_at + 22:
+            return None
+
+        directory_size, directory_offset = struct.unpack("<II", tail[eocd_at + 12:eocd_at + 20])
+
+        if directory_offset == 0xFFFFFFFF:
+            locator_at = tail.rfind(b"PK\x06\x07", 0, eocd_at)
+
+            if locator_at < 0:
+                return None
+
+            zip64_offset = struct.unpack("<Q", tail[locator_at + 8:locator_at + 16])[0]
+            zip64_record = self.remote.read(zip64_offset, 56)
+            directory_size, directory_offset = struct.unpack("<QQ", zip64_record[40:56])
+
+        directory = self.remote.read(directory_offset, directory_size)
+        member = self.find_member(directory, "docProps/core.xml")
+
+        if member is None:
+            return None
+
+        method, compressed_size, local_offset = member
+        local_header = self.remote.read(local_offset, 30)
+
+        if local_header[:4] != b"PK\x03\x04":
+            return None
+
+        name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+        data = self.remote.read(local_offset + 30 + name_length + extra_length, compressed_size)
+
+        if method == 8:
+            data = zlib.decompress(data, -15)
+        elif method != 0:
+            return None
+
+        return self.parse_core_properties(data)
+
+    @staticmethod
+    def find_member(directory, name):
+        position = 0
+
+        while directory[position:position + 4] == b"PK\x01\x02":
+            method = struct.unpack("<H", directory[position + 10:position + 12])[0]
+            compressed_size = struct.unpack("<I", directory[position + 20:position + 24])[0]
+            name_length, extra_length, comment_length = struct.unpack("<HHH", directory[position + 28:position + 34])
+            local_offset = struct.unpack("<I", directory[position + 42:position + 46])[0]
+            member_name = directory[position + 46:position + 46 + name_length].decode("utf-8", errors="replace")
+
+            if member_name == name:
+                return method, compressed_size, local_offset
+
+            position += 46 + name_length + extra_length + comment_length
+
+        return None
+
+    def parse_core_properties(self, data):
+        root = ElementTree.fromstring(data)
+        fields = {
+            "title": "dc:title",
+            "author": "dc:creator",
+            "created": "dcterms:created",
+            "last_modified": "dcterms:modified",
+            "last_modified_by": "cp:lastModifiedBy"
+        }
+        metadata = {}
+
+        for key, path in fields.items():
+            element = root.find(path, self.namespaces)
+            value = (element.text or "").strip() if element is not None else ""
+
+            if key in ["created", "last_modified"] and value:
+                try:
+                    value = datetime.fromisoformat(value.replace("Z", "+00:00")).strftime('%Y-%m-%d %H:%M:%S')
+                except ValueError:
+                    pass
+
+            metadata[key] = value
+
+        return metadata
+
+class DocumentPreviewer:
+    document_extensions = {".pdf": "pdf", ".docx": "docx"}
+
+    def __init__(self, http_client, tail_bytes=65536, timeout=10, max_full_bytes=16 * 1024 * 1024):
+        """
+        Previews PDF and DOCX links from their metadata alone, read with HTTP Range requests
+        and parsed in memory, so a large document costs a few KB of transfer.
+        """
+        self.http_client = http_client
+        self.tail_bytes = tail_bytes
+        self.timeout = timeout
+        self.max_full_bytes = max_full_bytes
+
+    def handles(self, url):
+        return os.path.splitext(urlparse(url).path.lower())[1] in self.document_extensions
+
+    def is_document_url(self, url):
+        """True for URLs with a PDF / DOCX extension, or whose HEAD response says they serve one."""
+        if self.handles(url):
+            return True
+
+        try:
+            response = self.http_client.head(url, timeout=self.timeout, allow_redirects=True)
+        except Exception as e:
+            logger.debug(f"HEAD request failed for {url}: {str(e)}")
+            return False
+
+        return response.status_code == 200 and self.is_document_type(response.headers.get("content-type", ""))
+
+    @staticmethod
+    def is_document_type(content_type):
+        return DocumentPreviewer.kind_for(content_type) is not None
+
+    @staticmethod
+    def kind_for(content_type):
+        if any(pdf_type in content_type for pdf_type in PDF_CONTENT_TYPES):
+            return "pdf"
+        if any(docx_type in content_type for docx_type in DOCX_CONTENT_TYPES):
+            return "docx"
+
+        return None
+
+    def preview(self, url, content_type=None):
+        """
+        Returns the preview line for a PDF / DOCX link, None if the URL turns out not to be one,
+        or "" if it is (or claims to be) a document that can't be read, so callers don't retry it
+        in other tiers. Without a content type or a telling extension, the first range response decides.
+        """
+        basename = unquote(os.path.basename(urlparse(url).path)) or url
+        remote = RemoteFile(self.http_client, url, timeout=self.timeout, max_full_bytes=self.max_full_bytes)
+        kind = self.kind_for(content_type or "") or self.document_extensions.get(os.path.splitext(urlparse(url).path.lower())[1])
+
+        try:
+            if kind is None:
+                remote.tail(self.tail_bytes)
+                kind = self.kind_for(remote.content_type)
+
+            if kind == "pdf":
+                metadata = PDFInfoReader(remote, self.tail_bytes).read()
+
+                # A .pdf URL that serves an HTML page is left to the other tiers
+                if metadata is None and self.kind_for(remote.content_type) != "pdf":
+                    return None if remote.content_type else ""
+
+                title = (metadata or {}).get("title") or basename
+                message = f"[ {title} ]"
+            elif kind == "docx":
+                metadata = DOCXCoreReader(remote, self.tail_bytes).read()
+
+                if metadata is None:
+                    return None if remote.content_type and self.kind_for(remote.content_type) != "docx" else ""
+
+                title = metadata["title"] or basename
+                message = f"[ Title: {title} ] [ Author: {metadata['author']} ] [ Created: {metadata['created']} ] [ Last Modified: {metadata['last_modified']} ] [ Last Modified By: {metadata['last_modified_by']} ]"
+            else:
+                return None
+        except Exception as e:
+            logger.debug(f"Document preview failed for {url}: {str(e)}")
+
+            # Likewise, a URL that turns out to serve something else is left to the other tiers
+            if kind is None or (remote.content_type and not self.is_document_type(remote.content_type) and not any(
+                binary_type in remote.content_type for binary_type in BINARY_CONTENT_TYPES
+            )):
+                return None
+
+            return ""
+
+        logger.debug(f"Previewed {url} from {remote.bytes_transferred} bytes")
+        return message.replace("\r", "").replace("\n", " ")
@@ -0,0 +1,216 @@
+import re
+import threading
+import time
+from collections import deque
+
+class GroqBudgetExceeded(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def parse_reset_duration(duration):
+    """
+    Converts Groq's reset header format ("7.66s", "2m59.56s", "1h2m", "250ms") to seconds.
+    """
+    if not duration:
+        return None
+
+    total_seconds = 0.0
+
+    for amount, unit in re.findall(r"([\d\.]+)(ms|h|m|s)", duration):
+        total_seconds += float(amount) * {"ms": 0.001, "h": 3600, "m": 60, "s": 1}[unit]
+
+    return total_seconds
+
+class GroqBudget:
+    def __init__(self, requests_per_minute=30, tokens_per_minute=12000, requests_per_day=1000, tokens_per_day=100000, max_wait=60):
+        """
+        Client-side request/token budget for the Groq API.
+
+        Minute and day windows are tracked locally from every reservation and corrected
+        with the x-ratelimit-* response headers, so work is held or rejected before it
+        would trip a 429. acquire() holds a caller for at most max_wait seconds; the default
+        covers a full minute window, while lower values trade waiting for an earlier retry_after.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_day = requests_per_day
+        self.tokens_per_day = tokens_per_day
+        self.max_wait = max_wait
+
+        self.usage = deque()  # Schema: [{"at": monotonic timestamp, "tokens": int}]
+        self.lock = threading.Lock()
+
+        # Latest server-reported state
+        self.remaining_requests_day = None
+        self.requests_day_reset_at = None
+        self.remaining_tokens_minute = None
+        self.tokens_minute_reset_at = None
+        self.blocked_until = None
+
+    def _prune(self, now):
+        while self.usage and now - self.usage[0]["at"] > 86400:
+            self.usage.popleft()
+
+    def _window(self, now, seconds):
+        entries = [entry for entry in self.usage if now - entry["at"] <= seconds]
+        return len(entries), sum(entry["tokens"] for entry in entries)
+
+    def _wait_for_minute_window(self, now, estimated_tokens):
+        """Seconds until a request of estimated_tokens fits the per-minute limits."""
+        requests_minute, tokens_minute = self._window(now, 60)
+        recent = [entry for entry in self.usage if now - entry["at"] <= 60]
+        wait = 0.0
+
+        if requests_minute + 1 > self.requests_per_minute and recent:
+            wait = max(wait, 60 - (now - recent[0]["at"]))
+
+        if tokens_minute + estimated_tokens > self.tokens_per_minute:
+            # Wait until enough of the last minute's tokens age out
+            excess = tokens_minute + estimated_tokens - self.tokens_per_minute
+
+            for entry in recent:
+                excess -= entry["tokens"]
+
+                if excess <= 0:
+                    wait = max(wait, 60 - (now - entry["at"]))
+                    break
+
+        if self.remaining_tokens_minute is not None and self.tokens_minute_reset_at and now < self.tokens_minute_reset_at:
+            if self.remaining_tokens_minute < estimated_tokens:
+                wait = max(wait, self.tokens_minute_reset_at - now)
+
+        return wait
+
+    def _wait_for_day_window(self, now, estimated_tokens, estimated_requests):
+        """Seconds until estimated_tokens / estimated_requests fit the daily limits."""
+        requests_day, tokens_day = self._window(now, 86400)
+        wait = 0.0
+
+        if self.blocked_until and now < self.blocked_until:
+            wait = self.blocked_until - now
+
+        if requests_day + estimated_requests > self.requests_per_day and self.usage:
+            wait = max(wait, 86400 - (now - self.usage[0]["at"]))
+
+        if self.remaining_requests_day is not None and self.requests_day_reset_at and now < self.requests_day_reset_at:
+            if self.remaining_requests_day < estimated_requests:
+                wait = max(wait, self.requests_day_reset_at - now)
+
+        if tokens_day + estimated_tokens > self.tokens_per_day:
+            excess = tokens_day + estimated_tokens - self.tokens_per_day
+
+            for entry in self.usage:
+                excess -= entry["tokens"]
+
+                if excess <= 0:
+                    wait = max(wait, 86400 - (now - entry["at"]))
+                    break
+
+        return wait
+
+    def admit(self, estimated_tokens, estimated_requests):
+        """
+        Admission check for upcoming work: raises GroqBudgetExceeded if today's
+        remaining capacity can't cover it, before any quota is spent.
+        """
+        if estimated_tokens > self.tokens_per_day:
+            raise GroqBudgetExceeded(f"Request needs ~{estimated_tokens} tokens, more than the daily budget of {self.tokens_per_day}.", None)
+
+        with self.lock:
+            now = time.monotonic()
+            self._prune(now)
+            wait = self._wait_for_day_window(now, estimated_tokens, estimated_requests)
+
+        if wait > 0:
+            raise GroqBudgetExceeded(f"Groq daily budget can't cover ~{estimated_tokens} tokens / {estimated_requests} requests right now.", wait)
+
+    def acquire(self, estimated_tokens):
+        """
+        Reserves one request of estimated_tokens, holding for up to max_wait seconds for the
+        per-minute window. Returns a reservation to pass to record(); raises GroqBudgetExceeded
+        with retry_after set if the budget won't free up in time.
+        """
+        if estimated_tokens > self.tokens_per_minute:
+            raise GroqBudgetExceeded(f"Request needs ~{estimated_tokens} tokens, more than the per-minute budget of {self.tokens_per_minute}.", None)
+
+        deadline = time.monotonic() + self.max_wait
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._prune(now)
+                day_wait = self._wait_for_day_window(now, estimated_tokens, 1)
+                minute_wait = self._wait_for_minute_window(now, estimated_tokens)
+
+                if day_wait <= 0 and minute_wait <= 0:
+                    reservation = {"at": now, "tokens": estimated_tokens}
+                    self.usage.append(reservation)
+                    return reservation
+
+            wait = max(day_wait, minute_wait)
+
+            if time.monotonic() + wait > deadline:
+                raise GroqBudgetExceeded("Groq rate budget exhausted.", wait)
+
+            time.sleep(wait)
+
+    def record(self, reservation, headers=None, used_tokens=None):
+        """
+        Corrects a reservation with the tokens actually used and syncs with the rate limit headers.
+        """
+        now = time.monotonic()
+
+        with self.lock:
+            if used_tokens is not None:
+                reservation["tokens"] = used_tokens
+
+            if not headers:
+                return
+
+            if headers.get("x-ratelimit-remaining-requests") is not None:
+                self.remaining_requests_day = int(float(headers["x-ratelimit-remaining-requests"]))
+                reset = parse_reset_duration(headers.get("x-ratelimit-reset-requests"))
+                self.requests_day_reset_at = now + reset if reset is not None else None
+
+            if headers.get("x-ratelimit-remaining-tokens") is not None:
+                self.remaining_tokens_minute = int(float(headers["x-ratelimit-remaining-tokens"]))
+                reset = parse_reset_duration(headers.get("x-ratelimit-reset-tokens"))
+                self.tokens_minute_reset_at = now + reset if reset is not None else None
+
+            if headers.get("x-ratelimit-limit-requests") is not None:
+                self.requests_per_day = int(float(headers["x-ratelimit-limit-requests"]))
+
+            if headers.get("x-ratelimit-limit-tokens") is not None:
+                self.tokens_per_minute = int(float(headers["x-ratelimit-limit-tokens"]))
+
+    def block_for(self, seconds):
+        """Honours a server-imposed lockout (e.g. after a 429)."""
+        with self.lock:
+            self.blocked_until = time.monotonic() + seconds
+
+    def status(self):
+        with self.lock:
+            now = time.monotonic()
+            self._prune(now)
+            requests_minute, tokens_minute = self._window(now, 60)
+            requests_day, tokens_day = self._window(now, 86400)
+
+            remaining_requests_day = self.requests_per_day - requests_day
+
+            if self.remaining_requests_day is not None and self.requests_day_reset_at and now < self.requests_day_reset_at:
+                remaining_requests_day = min(remaining_requests_day, self.remaining_requests_day)
+
+            status = {
+                "requests_minute": max(0, self.requests_per_minute - requests_minute),
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_minute": max(0, self.tokens_per_minute - tokens_minute),
+                "tokens_per_minute": self.tokens_per_minute,
+                "requests_day": max(0, remaining_requests_day),
+                "requests_per_day": self.requests_per_day,
+                "tokens_day": max(0, self.tokens_per_day - tokens_day),
+                "tokens_per_day": self.tokens_per_day,
+                "blocked_for": max(0, self.blocked_until - now) if self.blocked_until else 0
+            }
+
+        return status
@@ -0,0 +1,167 @@
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from helpers.TokenBucket import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+class HTTPClient:
+    def __init__(self, timeout=15, pool_maxsize=10, max_sessions=32, max_cached_responses=256, max_cached_body_bytes=8 * 1024 * 1024, max_cached_total_bytes=64 * 1024 * 1024):
+        """
+        Shared HTTP client: one keep-alive session per host, a default timeout,
+        per-host header profiles and rate limits, and ETag / Last-Modified revalidation.
+        Only the max_sessions most recently used hosts keep a session open, and the responses
+        kept for revalidation are capped both in number and in total body bytes.
+        """
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.max_sessions = max_sessions
+        self.max_cached_responses = max_cached_responses
+        self.max_cached_body_bytes = max_cached_body_bytes
+        self.max_cached_total_bytes = max_cached_total_bytes
+
+        self.sessions = OrderedDict()
+        self.profiles = []
+        self.rate_limits = []
+        self.validated_responses = OrderedDict()
+        self.cached_bytes = 0
+        self.lock = threading.Lock()
+
+    def register_profile(self, host_suffix, headers):
+        """
+        Attaches default headers to every request whose host ends with host_suffix
+        (e.g. "sec.gov" covers www.sec.gov and data.sec.gov).
+        """
+        with self.lock:
+            self.profiles.append((host_suffix.lower(), dict(headers)))
+
+    def register_rate_limit(self, host_suffix, requests_per_second):
+        """
+        Caps the request rate to every host ending with host_suffix, shared across all threads
+        (e.g. the SEC's fair-access policy of 10 requests per second).
+        """
+        with self.lock:
+            self.rate_limits.append((host_suffix.lower(), TokenBucket(requests_per_second, requests_per_second)))
+
+    def throttle(self, url):
+        host = urlparse(url).hostname or ""
+
+        for host_suffix, bucket in self.rate_limits:
+            if host == host_suffix or host.endswith("." + host_suffix):
+                bucket.acquire()
+
+    def headers_for(self, url):
+        host = urlparse(url).hostname or ""
+        headers = {"Accept-Encoding": ACCEPT_ENCODING}  # gzip/deflate, plus br/zstd when the decoders are installed
+
+        for host_suffix, profile_headers in self.profiles:
+            if host == host_suffix or host.endswith("." + host_suffix):
+                headers.update(profile_headers)
+
+        return headers
+
+    def session_for(self, url):
+        host = urlparse(url).netloc.lower()
+
+        with self.lock:
+            session = self.sessions.get(host)
+
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.sessions[host] = session
+
+                # Link previews reach arbitrary hosts; close the least recently used ones' sockets
+                while len(self.sessions) > self.max_sessions:
+                    evicted_host, evicted_session = self.sessions.popitem(last=False)
+                    evicted_session.close()
+                    logger.debug(f"Closed idle HTTP session for {evicted_host}")
+
+            self.sessions.move_to_end(host)
+            return session
+
+    def get(self, url, headers=None, timeout=None, revalidate=True, **kwargs):
+        """
+        GET through the pooled session for the URL's host.
+        When revalidate is set, a previous response carrying an ETag or Last-Modified
+        is revalidated and returned as-is on 304 Not Modified.
+        """
+        request_headers = self.headers_for(url)
+
+        if headers:
+            request_headers.update(headers)
+
+        # Streamed bodies are consumed by the caller, so there is nothing to keep for revalidation
+        revalidate = revalidate and not kwargs.get("stream", False)
+        cache_key = (url, tuple(sorted((kwargs.get("params") or {}).items())))
+        cached_response = None
+
+        if revalidate:
+            with self.lock:
+                cached_response = self.validated_responses.get(cache_key)
+
+            if cached_response is not None:
+                if cached_response.headers.get("ETag"):
+                    request_headers["If-None-Match"] = cached_response.headers["ETag"]
+                if cached_response.headers.get("Last-Modified"):
+                    request_headers["If-Modified-Since"] = cached_response.headers["Last-Modified"]
+
+        self.throttle(url)
+        response = self.session_for(url).get(url, headers=request_headers, timeout=timeout or self.timeout, **kwargs)
+
+        if cached_response is not None and response.status_code == 304:
+            logger.debug(f"Revalidated cached response for {url}")
+
+            with self.lock:
+                if cache_key in self.validated_responses:
+                    self.validated_responses.move_to_end(cache_key)
+
+            return cached_response
+
+        has_validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+
+        if revalidate and response.status_code == 200 and has_validator and len(response.content) <= self.max_cached_body_bytes:
+            with self.lock:
+                previous = self.validated_responses.pop(cache_key, None)
+
+                if previous is not None:
+                    self.cached_bytes -= len(previous.content)
+
+                self.validated_responses[cache_key] = response
+                self.cached_bytes += len(response.content)
+
+                while len(self.validated_responses) > self.max_cached_responses or self.cached_bytes > self.max_cached_total_bytes:
+                    evicted_key, evicted_response = self.validated_responses.popitem(last=False)
+                    self.cached_bytes -= len(evicted_response.content)
+
+        return response
+
+    def head(self, url, headers=None, timeout=None, **kwargs):
+        """
+        HEAD through the pooled session for the URL's host. Never revalidated.
+        """
+        request_headers = self.headers_for(url)
+
+        if headers:
+            request_headers.update(headers)
+
+        self.throttle(url)
+        return self.session_for(url).head(url, headers=request_headers, timeout=timeout or self.timeout, **kwargs)
+
+    def post(self, url, headers=None, timeout=None, **kwargs):
+        """
+        POST through the pooled session for the URL's host. Never revalidated.
+        """
+        request_headers = self.headers_for(url)
+
+        if headers:
+            request_headers.update(headers)
+
+        self.throttle(url)
+        return self.session_for(url).post(url, headers=request_headers, timeout=timeout or self.timeout, **kwargs)
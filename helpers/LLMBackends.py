@@ -0,0 +1,105 @@
+import re
+from helpers.GroqBudget import parse_reset_duration
+
+class GroqBackend:
+    name = "groq"
+    label = "Groq"
+
+    def __init__(self, api_key, model="llama-3.3-70b-versatile", budget=None, timeout=60, base_url="https://api.groq.com/openai/v1"):
+        """
+        Chat completions against Groq's OpenAI-compatible API, metered by an optional GroqBudget.
+
+        The client's own retries are disabled so a 429 or a slow response surfaces
+        straight away and the caller can move on to its fallback backend.
+        """
+        from openai import OpenAI
+
+        self.model = model
+        self.budget = budget
+        self.client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+
+    def admit(self, estimated_tokens, estimated_requests):
+        """Raises GroqBudgetExceeded if today's quota can't cover a whole pipeline."""
+        if self.budget is not None:
+            self.budget.admit(estimated_tokens, estimated_requests)
+
+    def complete(self, system_prompt, user_prompt, estimated_tokens):
+        from openai import RateLimitError
+
+        reservation = None
+
+        # Raises GroqBudgetExceeded when the call can't be made without tripping a rate limit
+        if self.budget is not None:
+            reservation = self.budget.acquire(estimated_tokens)
+
+        try:
+            raw_response = self.client.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.0
+            )
+        except RateLimitError as e:
+            if self.budget is not None:
+                self.budget.block_for(self.retry_after(e))
+            raise
+
+        response = raw_response.parse()
+
+        if reservation is not None:
+            used_tokens = response.usage.total_tokens if response.usage else None
+            self.budget.record(reservation, raw_response.headers, used_tokens)
+
+        return response.choices[0].message.content
+
+    @staticmethod
+    def retry_after(error):
+        """Seconds Groq asked us to back off for, from the retry-after header or the error text."""
+        retry_after = error.response.headers.get("retry-after") if error.response is not None else None
+
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+
+        time_match = re.search(r"Please try again in\s+([0-9hms\.]+)", str(error), re.IGNORECASE)
+        return parse_reset_duration(time_match.group(1)) if time_match else 300
+
+class OllamaBackend:
+    name = "ollama"
+    label = "Ollama"
+
+    def __init__(self, http_client, url="http://localhost:11434/api/generate", model="llama3.1", timeout=300, num_ctx=8192):
+        """
+        Local inference through an Ollama server's /api/generate endpoint in JSON mode.
+        num_ctx is raised above Ollama's default so a full proxy excerpt fits the context window.
+        """
+        self.http_client = http_client
+        self.url = url
+        self.model = model
+        self.timeout = timeout
+        self.num_ctx = num_ctx
+
+    def admit(self, estimated_tokens, estimated_requests):
+        """A local model has no quota to check."""
+        return None
+
+    def complete(self, system_prompt, user_prompt, estimated_tokens):
+        payload = {
+            "model": self.model,
+            "system": system_prompt,
+            "prompt": user_prompt,
+            "format": "json",
+            "stream": False,
+            "options": {
+                "temperature": 0.0,
+                "num_ctx": max(self.num_ctx, estimated_tokens)
+            }
+        }
+
+        response = self.http_client.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["response"]
@@ -0,0 +1,123 @@
+import re
+
+class LinePacker:
+    # RFC 1459 line limit, CR LF included
+    line_limit = 512
+
+    # A formatting code with its arguments, or a single character
+    unit_pattern = re.compile(r"\x03(?:\d{1,2}(?:,\d{1,2})?)?|\x04(?:[0-9a-fA-F]{6}(?:,[0-9a-fA-F]{6})?)?|.", re.DOTALL)
+    toggle_codes = "\x02\x1d\x1f\x1e\x11\x16"  # bold, italic, underline, strikethrough, monospace, reverse
+    ellipsis = "..."
+
+    # Worst case for the "~user@host" part of our prefix until the server tells us the real one
+    default_userhost = "~" + "u" * 10 + "@" + "h" * 63
+
+    def __init__(self, userhost=None):
+        """
+        Splits long replies into IRC lines that fit the 512-byte limit exactly, as other
+        clients will receive them (":nick!user@host PRIVMSG target :text"). Splits land on
+        word boundaries where possible and never inside a UTF-8 character or a formatting
+        code; colors and styles active at a split are re-applied on the next line.
+        """
+        self.userhost = userhost
+
+    def payload_bytes(self, nickname, command, target):
+        prefix = f":{nickname}!{self.userhost or self.default_userhost} {command.upper()} {target} :"
+        return self.line_limit - len(prefix.encode("utf-8")) - 2
+
+    def formatting_prefix(self, state):
+        prefix = "".join(code for code in self.toggle_codes if state.get(code))
+
+        if state.get("color"):
+            prefix += state["color"]
+
+        return prefix
+
+    def update_state(self, state, unit):
+        if unit == "\x0f":
+            state.clear()
+        elif unit in self.toggle_codes:
+            state[unit] = not state.get(unit)
+        elif unit.startswith("\x03") or unit.startswith("\x04"):
+            # A bare \x03 resets colors; two-digit codes keep a following digit from being read as part of them
+            if len(unit) == 1:
+                state.pop("color", None)
+            elif unit.startswith("\x03"):
+                state["color"] = "\x03" + ",".join(f"{int(part):02d}" for part in unit[1:].split(","))
+            else:
+                state["color"] = unit
+
+    def visible_text(self, line):
+        return "".join(unit for unit in self.unit_pattern.findall(line) if len(unit) == 1 and unit not in self.toggle_codes + "\x03\x04\x0f").strip()
+
+    def pack(self, text, max_bytes, max_lines=None):
+        """
+        Returns the fewest lines of at most max_bytes each that carry text. If max_lines
+        would be exceeded, the last line is cut short and ends with an ellipsis.
+        """
+        lines = []
+        state = {}
+        current = ""
+
+        def size(chunk):
+            return len(chunk.encode("utf-8"))
+
+        def new_line():
+            lines.append(current.rstrip())
+            return self.formatting_prefix(state)
+
+        for token in re.split(r"( +)", text.strip()):
+            if not token or (token.isspace() and not self.visible_text(current)):
+                continue
+
+            if size(current) + size(token) <= max_bytes:
+                current += token
+
+                for unit in self.unit_pattern.findall(token):
+                    self.update_state(state, unit)
+
+                continue
+
+            if token.isspace():
+                # Break here; the spaces themselves aren't carried over
+                current = new_line()
+                continue
+
+            if self.visible_text(current) and size(self.formatting_prefix(state)) + size(token) <= max_bytes:
+                current = new_line()
+
+            # Place the word unit by unit, breaking it only if it can't fit on a line of its own
+            for unit in self.unit_pattern.findall(token):
+                if size(current) + size(unit) > max_bytes and self.visible_text(current):
+                    current = new_line()
+
+                current += unit
+                self.update_state(state, unit)
+
+        lines.append(current.rstrip())
+        lines = [line for line in lines if self.visible_text(line)]
+
+        if max_lines is not None and len(lines) > max_lines:
+            lines = lines[:max_lines]
+            lines[-1] = self.truncate(lines[-1], max_bytes - len(self.ellipsis)) + self.ellipsis
+
+        return lines
+
+    def truncate(self, line, max_bytes):
+        """Cuts a line to max_bytes at the last whole unit, preferring the last word boundary."""
+        kept = ""
+        kept_bytes = 0
+
+        for unit in self.unit_pattern.findall(line):
+            unit_bytes = len(unit.encode("utf-8"))
+
+            if kept_bytes + unit_bytes > max_bytes:
+                break
+
+            kept += unit
+            kept_bytes += unit_bytes
+
+        if len(kept) < len(line) and " " in kept:
+            kept = kept[:kept.rindex(" ")]
+
+        return kept.rstrip()
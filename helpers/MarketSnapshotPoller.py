@@ -0,0 +1,129 @@
+import logging
+import threading
+from datetime import datetime, timedelta, time as dt_time
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+class MarketSnapshotPoller:
+    market_timezone = ZoneInfo("America/New_York")
+    market_open = dt_time(9, 30)
+    market_close = dt_time(16, 0)
+
+    def __init__(self, interval=60, off_hours_interval=900):
+        """
+        Keeps the fixed-list market replies (.markets, .bonds, ...) pre-built in memory.
+        Each registered builder returns the full reply line; a background thread re-runs
+        them every `interval` seconds while US markets are open and every
+        `off_hours_interval` seconds otherwise.
+        """
+        self.interval = interval
+        self.off_hours_interval = off_hours_interval
+
+        self.builders = {}
+        self.refresh_locks = {}
+        self.snapshots = {}  # Schema: {"bonds": ("1Y: 4.01 ...", datetime)}
+
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def register(self, name, builder):
+        self.builders[name] = builder
+        self.refresh_locks[name] = threading.Lock()
+
+    def is_market_open(self, now=None):
+        """Regular NYSE session, Monday to Friday; exchange holidays are not tracked."""
+        now = (now or datetime.now(self.market_timezone)).astimezone(self.market_timezone)
+        return now.weekday() < 5 and self.market_open <= now.time() < self.market_close
+
+    def current_interval(self):
+        return self.interval if self.is_market_open() else self.off_hours_interval
+
+    def seconds_until_session_change(self, now=None):
+        """Seconds until the next regular-session open or close."""
+        now = (now or datetime.now(self.market_timezone)).astimezone(self.market_timezone)
+
+        for days in range(8):
+            day = (now + timedelta(days=days)).date()
+
+            if day.weekday() >= 5:
+                continue
+
+            for boundary in [self.market_open, self.market_close]:
+                moment = datetime.combine(day, boundary, tzinfo=self.market_timezone)
+
+                if moment > now:
+                    return moment.timestamp() - now.timestamp()
+
+        return self.off_hours_interval
+
+    def next_wait(self):
+        # Wake at the open and close so a session never starts on an off-hours snapshot
+        return min(self.current_interval(), self.seconds_until_session_change())
+
+    def max_age(self):
+        # A snapshot older than this means the poller has fallen behind; callers build live instead
+        return 2 * self.current_interval()
+
+    def fresh_snapshot(self, name):
+        with self.lock:
+            snapshot = self.snapshots.get(name)
+
+        if snapshot is not None and (datetime.now(self.market_timezone) - snapshot[1]).total_seconds() <= self.max_age():
+            return snapshot
+
+        return None
+
+    def build(self, name):
+        as_of = datetime.now(self.market_timezone)
+        message = self.builders[name]()
+
+        if not message:
+            logger.debug(f"Market snapshot {name} came back empty, keeping the previous one")
+            return None
+
+        with self.lock:
+            self.snapshots[name] = (message, as_of)
+
+        return message, as_of
+
+    def refresh(self, name):
+        """Rebuilds one snapshot; returns the (message, as_of) pair, or None if nothing came back."""
+        with self.refresh_locks[name]:
+            return self.build(name)
+
+    def get(self, name):
+        """Returns the latest (message, as_of) pair, building it on the spot if there is none yet."""
+        snapshot = self.fresh_snapshot(name)
+
+        if snapshot is not None:
+            return snapshot
+
+        # Concurrent callers share one live build instead of each scraping the same list
+        with self.refresh_locks[name]:
+            snapshot = self.fresh_snapshot(name) or self.build(name)
+
+        if snapshot is None:
+            with self.lock:
+                snapshot = self.snapshots.get(name)
+
+        return snapshot
+
+    def start(self):
+        threading.Thread(target=self._refresh_loop, name="market-snapshots", daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _refresh_loop(self):
+        while not self.stopped.is_set():
+            for name in list(self.builders):
+                if self.stopped.is_set():
+                    return
+
+                try:
+                    self.refresh(name)
+                except Exception as e:
+                    logger.debug(f"Failed to refresh market snapshot {name}: {e}")
+
+            self.stopped.wait(self.next_wait())
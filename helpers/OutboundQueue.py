@@ -0,0 +1,103 @@
+import logging
+import re
+import threading
+from collections import deque
+import irc.client
+from helpers.LinePacker import LinePacker
+from helpers.TokenBucket import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+class OutboundQueue:
+    separator = " | "
+
+    def __init__(self, connection, lines_per_second=0.5, burst=4, max_pending_lines=100, drain_interval=0.1):
+        """
+        Paces every line sent on one IRC connection to stay under the server's flood limits.
+
+        Lines are queued from any thread and written by the reactor thread, which drains the
+        queue on its scheduler. Long messages are split by a LinePacker to the exact payload
+        the server will relay. Interactive lines (the first line of each reply) go out before
+        bulk ones, empty lines are dropped, and consecutive queued lines to the same target
+        are joined into as few lines as possible.
+        """
+        self.connection = connection
+        self.bucket = TokenBucket(lines_per_second, burst)
+        self.packer = LinePacker()
+        self.max_pending_lines = max_pending_lines
+
+        self.interactive = deque()  # Schema: [(command, target, text)]
+        self.bulk = deque()
+        self.lock = threading.Lock()
+
+        connection.reactor.scheduler.execute_every(drain_interval, self.drain)
+
+    def payload_bytes(self, command, target):
+        return self.packer.payload_bytes(self.connection.get_nickname(), command, target)
+
+    def enqueue(self, command, target, text, interactive=False, max_lines=None):
+        """Packs text into lines and queues them; returns how many lines were queued."""
+        max_bytes = self.payload_bytes(command, target)
+        lines = []
+
+        for paragraph in re.split(r"[\r\n]+", text or ""):
+            remaining = None if max_lines is None else max_lines - len(lines)
+
+            if remaining is not None and remaining <= 0:
+                break
+
+            lines.extend(self.packer.pack(paragraph, max_bytes, max_lines=remaining))
+
+        with self.lock:
+            for i, line in enumerate(lines):
+                queue = self.interactive if interactive and i == 0 else self.bulk
+                queue.append((command, target, line))
+
+            while len(self.bulk) > self.max_pending_lines:
+                command, target, line = self.bulk.popleft()
+                logger.debug(f"Outbound queue full, dropping line to {target}: {line[:50]}")
+
+        return len(lines)
+
+    def pending(self):
+        with self.lock:
+            return len(self.interactive) + len(self.bulk)
+
+    def next_line(self):
+        with self.lock:
+            queue = self.interactive or self.bulk
+
+            if not queue:
+                return None
+
+            command, target, text = queue.popleft()
+            max_bytes = self.payload_bytes(command, target)
+
+            while queue and queue[0][:2] == (command, target):
+                # Close any colors or styles left open so they don't run into the next message
+                reset = "\x0f" if re.search(r"[\x02\x03\x04\x11\x16\x1d\x1e\x1f]", text) else ""
+                joined = text + reset + self.separator + queue[0][2]
+
+                if len(joined.encode("utf-8")) > max_bytes:
+                    break
+
+                text = joined
+                queue.popleft()
+
+            return command, target, text
+
+    def drain(self):
+        """Runs on the reactor thread: sends as many lines as the flood bucket allows."""
+        while self.pending() and self.bucket.try_acquire():
+            command, target, text = self.next_line()
+
+            try:
+                getattr(self.connection, command)(target, text)
+            except irc.client.MessageTooLong as e:
+                logger.debug(f"Message too long: {str(e)}")
+            except irc.client.ServerNotConnectedError:
+                with self.lock:
+                    self.interactive.clear()
+                    self.bulk.clear()
+
+                return
@@ -0,0 +1,147 @@
+import re
+
+class ProxySectionIndexer:
+    # Phrases that mark the director and executive officer sections of a DEF 14A
+    governance_keywords = {
+        "director since": 6,
+        "executive officers": 6,
+        "election of directors": 5,
+        "director nominees": 5,
+        "nominees for director": 5,
+        "lead independent director": 5,
+        "executive chair": 5,
+        "chief executive officer": 4,
+        "chief financial officer": 4,
+        "chief operating officer": 4,
+        "chief technology officer": 4,
+        "independent director": 3,
+        "board of directors": 3,
+        "chairman": 3,
+        "chair of the board": 3,
+        "president": 2,
+        "nominee": 2,
+        "biography": 2,
+        "served as": 2,
+        "age": 1,
+    }
+
+    # Meeting notice and voting mechanics that crowd out the roster sections
+    boilerplate_keywords = {
+        "proxy card": -3,
+        "broker non-vote": -3,
+        "householding": -3,
+        "quorum": -2,
+        "record date": -2,
+        "vote by internet": -3,
+        "virtual meeting": -2,
+        "forward-looking statements": -3,
+        "say-on-pay": -1,
+    }
+
+    # Whole words only (plurals allowed), so "age" doesn't score "manage", "page" or "percentage"
+    keyword_patterns = [
+        (re.compile(rf"\b{re.escape(keyword)}s?\b"), weight)
+        for keyword, weight in {**governance_keywords, **boilerplate_keywords}.items()
+    ]
+
+    # "Jane Q. Doe, 54," / "John Smith - Chief Financial Officer" / "Director since 2015"
+    name_title_patterns = [
+        re.compile(r"\b[A-Z][a-z]+(?: [A-Z]\.)? [A-Z][a-zA-Z'\-]+,? (?:age )?\d{2}\b"),
+        re.compile(r"\b[A-Z][a-z]+(?: [A-Z]\.)? [A-Z][a-zA-Z'\-]+\s*(?:,|-|–|—|\()\s*(?:Chief|President|Executive|Senior Vice|Director|Chair)"),
+        re.compile(r"\bDirector since:? (?:19|20)\d{2}\b", re.IGNORECASE),
+        re.compile(r"\bAge:? \d{2}\b"),
+    ]
+
+    def __init__(self, token_budget=6000, passage_chars=1500, chars_per_token=4, opening_chars=500):
+        """
+        Local relevance ranker for proxy statements: splits the cleaned filing into passages,
+        scores them for governance content and packs the best ones into a token budget.
+        """
+        self.token_budget = token_budget
+        self.passage_chars = passage_chars
+        self.chars_per_token = chars_per_token
+        self.opening_chars = opening_chars
+
+    def split_passages(self, text):
+        """
+        Chops the text into roughly passage_chars-sized passages on sentence boundaries.
+        Stretches with no sentence breaks (tables) are cut at whitespace so no passage
+        runs past passage_chars.
+        """
+        sentences = [piece for sentence in re.split(r"(?<=[.;:!?])\s+", text) for piece in self.hard_split(sentence)]
+        passages = []
+        current = []
+        current_length = 0
+
+        for sentence in sentences:
+            if current and current_length + len(sentence) > self.passage_chars:
+                passages.append(" ".join(current))
+                current = []
+                current_length = 0
+
+            current.append(sentence)
+            current_length += len(sentence) + 1
+
+        if current:
+            passages.append(" ".join(current))
+
+        return passages
+
+    def hard_split(self, sentence):
+        pieces = []
+
+        while len(sentence) > self.passage_chars:
+            cut = sentence.rfind(" ", 0, self.passage_chars + 1)
+
+            if cut <= 0:
+                cut = self.passage_chars
+
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+
+        pieces.append(sentence)
+        return pieces
+
+    def score_passage(self, passage):
+        lowered = passage.lower()
+        score = 0
+
+        for pattern, weight in self.keyword_patterns:
+            # Cap repeats so one keyword-stuffed table doesn't dominate
+            score += weight * min(len(pattern.findall(lowered)), 3)
+
+        for pattern in self.name_title_patterns:
+            score += 3 * min(len(pattern.findall(passage)), 5)
+
+        return score
+
+    def select(self, text, token_budget=None):
+        """
+        Returns the highest-scoring passages that fit the token budget, in document order.
+        The start of the filing is always kept since the cover page carries the company name.
+        """
+        budget_chars = (token_budget or self.token_budget) * self.chars_per_token
+
+        if len(text) <= budget_chars:
+            return text
+
+        passages = self.split_passages(text)
+        scores = {i: self.score_passage(passages[i]) for i in range(1, len(passages))}
+        ranked = sorted(scores, key=scores.get, reverse=True)
+
+        # The cover page only needs to contribute the company name
+        passages[0] = passages[0][:self.opening_chars]
+        selected = {0}
+        used_chars = len(passages[0])
+
+        for i in ranked:
+            if scores[i] <= 0:
+                break
+
+            if used_chars + len(passages[i]) > budget_chars:
+                continue
+
+            selected.add(i)
+            used_chars += len(passages[i])
+
+        return " ... ".join(passages[i] for i in sorted(selected))[:budget_chars]
@@ -0,0 +1,86 @@
+import logging
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+def has_class(name):
+    """XPath predicate equivalent to the CSS class selector .name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+class QuoteExtractor:
+    def __init__(self, fields, stop_after, chunk_size=16384):
+        """
+        Pulls a few text fields out of a quote page without building the whole tree.
+
+        fields maps a name to an XPath expression, compiled once here. The page is fed to
+        lxml's pull parser chunk_size characters at a time; whenever an element carrying one
+        of the stop_after classes closes, the fields are evaluated on the partial tree and
+        parsing stops as soon as every one of them has matched.
+        """
+        self.fields = {name: etree.XPath(expression) for name, expression in fields.items()}
+        self.stop_after = set(stop_after)
+        self.chunk_size = chunk_size
+
+    def evaluate(self, root):
+        values = {}
+
+        for name, xpath in self.fields.items():
+            matches = xpath(root) if root is not None else []
+            values[name] = "".join(matches[0].itertext()).strip() if matches else None
+
+        return values
+
+    def closes_region(self, element):
+        return not self.stop_after.isdisjoint((element.get("class") or "").split())
+
+    def extract(self, text):
+        """Returns {field: text}; fields that never matched are None."""
+        parser = etree.HTMLPullParser(events=("end",))
+
+        for start in range(0, len(text), self.chunk_size):
+            parser.feed(text[start:start + self.chunk_size])
+
+            for event, element in parser.read_events():
+                if not self.closes_region(element):
+                    continue
+
+                values = self.evaluate(element.getroottree().getroot())
+
+                if all(values.values()):
+                    return values
+
+        try:
+            root = parser.close()
+        except etree.XMLSyntaxError as e:
+            logger.debug(f"Quote page didn't parse: {e}")
+            root = None
+
+        return self.evaluate(root)
+
+# CNBC quote pages: last price and change, e.g. "4,512.10" and "+12.30 (+0.27%)"
+cnbc_quote_strip = QuoteExtractor(
+    fields={
+        "price": f"//*[{has_class('QuoteStrip-lastPrice')}]",
+        "change": f"//*[{has_class('QuoteStrip-lastPriceStripContainer')}]/*[last()]/*[last()]"
+    },
+    stop_after=["QuoteStrip-lastPriceStripContainer"]
+)
+
+# CNBC bond pages: the yield from the quote strip, price and previous close from the key stats list
+cnbc_bond_summary = QuoteExtractor(
+    fields={
+        "yield": f"//*[{has_class('QuoteStrip-lastPrice')}]",
+        "price": f"//h3[{has_class('Summary-title')}]/following-sibling::*[1][self::ul]/*[5][self::li and {has_class('Summary-stat')}]/span[{has_class('Summary-value')}]",
+        "previous_close": f"//h3[{has_class('Summary-title')}]/following-sibling::*[1][self::ul]/*[8][self::li and {has_class('Summary-stat')}]/span[{has_class('Summary-value')}]"
+    },
+    stop_after=["QuoteStrip-lastPriceStripContainer", "Summary-stat"]
+)
+
+# FT commodity tearsheets: price and "change / change %" from the overview bar
+ft_tearsheet_overview = QuoteExtractor(
+    fields={
+        "price": f"//*[{has_class('mod-tearsheet-overview__quote__bar')}]/*[1][self::li]//*[{has_class('mod-ui-data-list__value')}]",
+        "change": f"//*[{has_class('mod-tearsheet-overview__quote__bar')}]/*[2][self::li]//*[{has_class('mod-ui-data-list__value')}]"
+    },
+    stop_after=["mod-tearsheet-overview__quote__bar"]
+)
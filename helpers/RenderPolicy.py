@@ -0,0 +1,81 @@
+import re
+from urllib.parse import urlparse
+
+class RenderPolicy:
+    # Nothing a preview reads comes from these, so they are aborted unless a policy allows them
+    blocked_resource_types = {"image", "media", "font"}
+
+    tracker_domains = [
+        "doubleclick.net", "googlesyndication.com", "googletagmanager.com", "googletagservices.com",
+        "google-analytics.com", "adservice.google.com", "amazon-adsystem.com", "adnxs.com", "criteo.com",
+        "criteo.net", "taboola.com", "outbrain.com", "scorecardresearch.com", "quantserve.com", "chartbeat.com",
+        "chartbeat.net", "hotjar.com", "connect.facebook.net", "ads-twitter.com", "analytics.twitter.com",
+        "nr-data.net", "optimizely.com", "moatads.com", "pubmatic.com", "rubiconproject.com", "casalemedia.com"
+    ]
+
+    def __init__(self, name, domains=(), host_pattern=None, wait_until="domcontentloaded", wait_for_selector=None,
+                 stealth=False, interact=False, reload=False, extractor=None, time_budget=15, allowed_resources=()):
+        """
+        How the browser should render one kind of site for a link preview.
+
+        wait_until is handed to page.goto ("commit", "domcontentloaded", "load" or "networkidle");
+        wait_for_selector, if set, must appear before the extractor runs. stealth, interact and
+        reload turn on the anti-bot measures. extractor(page, url, page_title, deadline) builds the
+        preview line. time_budget caps the seconds spent on the page. allowed_resources lists the
+        normally blocked resource types (e.g. "image") the extractor depends on.
+        """
+        self.name = name
+        self.domains = [domain.lower() for domain in domains]
+        self.host_pattern = re.compile(host_pattern) if host_pattern else None
+        self.wait_until = wait_until
+        self.wait_for_selector = wait_for_selector
+        self.stealth = stealth
+        self.interact = interact
+        self.reload = reload
+        self.extractor = extractor
+        self.time_budget = time_budget
+        self.allowed_resources = set(allowed_resources)
+
+    def should_block(self, resource_type, url):
+        if resource_type in self.blocked_resource_types and resource_type not in self.allowed_resources:
+            return True
+
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == domain or host.endswith("." + domain) for domain in self.tracker_domains)
+
+    def route(self, route):
+        """Playwright route handler: aborts the requests this policy doesn't need."""
+        request = route.request
+
+        if self.should_block(request.resource_type, request.url):
+            route.abort()
+        else:
+            route.continue_()
+
+    def matches(self, host):
+        if self.host_pattern is not None and self.host_pattern.search(host):
+            return True
+
+        return any(host == domain or host.endswith("." + domain) for domain in self.domains)
+
+class RenderPolicyRegistry:
+    def __init__(self, default):
+        """
+        Ordered table of render policies; the first one matching a URL's host wins,
+        and `default` covers everything else.
+        """
+        self.default = default
+        self.policies = []
+
+    def register(self, policy):
+        self.policies.append(policy)
+        return policy
+
+    def policy_for(self, url):
+        host = (urlparse(url).hostname or "").lower()
+
+        for policy in self.policies:
+            if policy.matches(host):
+                return policy
+
+        return self.default
@@ -0,0 +1,89 @@
+import copy
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+class RosterCache:
+    def __init__(self, cache_dir):
+        """
+        On-disk store of .mgmt rosters, one JSON file per ticker.
+
+        Each file holds a chain of checkpoints for the current DEF 14A baseline: the roster
+        right after the proxy was parsed, then the roster after each Item 5.02 8-K was applied,
+        tagged with that filing's accession number.
+        """
+        self.cache_dir = os.path.join(cache_dir, "rosters")
+        self.lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path_for(self, ticker):
+        return os.path.join(self.cache_dir, f"{ticker.upper()}.json")
+
+    def load(self, ticker):
+        path = self.path_for(ticker)
+
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable roster cache {path}: {str(e)}")
+            return None
+
+    def store(self, ticker, proxy_accession, checkpoints):
+        """
+        checkpoints[0] is the proxy baseline; checkpoints[1:] follow the 8-Ks in chronological order.
+        """
+        update_accessions = [checkpoint["accession"] for checkpoint in checkpoints[1:]]
+        entry = {
+            "ticker": ticker.upper(),
+            "proxy_accession": proxy_accession,
+            "update_accessions": update_accessions,
+            "latest_accession": checkpoints[-1]["accession"],
+            "roster": checkpoints[-1]["roster"],
+            "checkpoints": checkpoints,
+            "updated_at": datetime.now().isoformat(timespec="seconds")
+        }
+
+        with self.lock:
+            # Write then rename so a concurrent reader never sees a half-written file
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+
+            with os.fdopen(fd, "w") as temp_file:
+                json.dump(entry, temp_file, indent=2)
+
+            os.replace(temp_path, self.path_for(ticker))
+
+        return entry
+
+    def resume(self, ticker, proxy_accession, update_accessions):
+        """
+        Returns the longest chain of checkpoints that is still valid for this proxy and
+        chronological list of 8-K accessions, or [] if the pipeline has to start from scratch.
+        The last checkpoint's roster is the state to resume from; every 8-K after
+        len(chain) - 1 still needs to be applied.
+        """
+        entry = self.load(ticker)
+
+        if entry is None or entry.get("proxy_accession") != proxy_accession:
+            return []
+
+        checkpoints = entry.get("checkpoints", [])
+
+        if not checkpoints or checkpoints[0].get("accession") != proxy_accession:
+            return []
+
+        chain = [checkpoints[0]]
+
+        for checkpoint, accession in zip(checkpoints[1:], update_accessions):
+            if checkpoint.get("accession") != accession:
+                break
+
+            chain.append(checkpoint)
+
+        return copy.deepcopy(chain)
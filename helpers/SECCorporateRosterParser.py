@@ -1,26 +1,59 @@
+import copy
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from helpers.HTTPClient import HTTPClient
+from helpers.StreamingDocumentExtractor import StreamingDocumentExtractor
+from helpers.ProxySectionIndexer import ProxySectionIndexer
+from helpers.GroqBudget import GroqBudgetExceeded
+from helpers.LLMBackends import GroqBackend
 
 class SECCorporateRosterParser:
-    def __init__(self, ticker, user_agent_email, GROQ_API_KEY):
+    # Rough sizing used to budget Groq calls before they are made
+    chars_per_token = 4
+    prompt_token_allowance = 600
+    completion_token_allowance = 1024
+
+    def __init__(self, ticker, user_agent_email, GROQ_API_KEY, http_client=None, roster_cache=None, ticker_registry=None, prefetch_workers=4, proxy_token_budget=6000, proxy_scan_chars=400000, groq_budget=None, llm_backends=None):
         """
         Initializes the pipeline for a specific company ticker.
         The user_agent_email is mandatory to prevent the SEC from blocking requests.
+        Pass the bot's shared http_client to reuse its warm SEC connections, a
+        RosterCache to skip the pipeline when no new relevant filing has been made,
+        and the shared SECTickerRegistry to avoid re-downloading the ticker map.
+        Filing documents are prefetched on up to prefetch_workers threads; the SEC
+        fair-access rate limit is enforced by the http_client.
+        Up to proxy_scan_chars of the DEF 14A are read and ranked locally so that only
+        the director / executive sections, within proxy_token_budget, reach the model.
+        A shared GroqBudget holds or rejects model calls before they would hit a 429.
+        llm_backends is the ordered list of model backends to try (primary first, then
+        fallbacks); it defaults to Groq alone.
         """
         self.ticker = ticker.upper()
         self.GROQ_API_KEY = GROQ_API_KEY
 
-        from openai import OpenAI
+        if llm_backends is None:
+            llm_backends = [GroqBackend(self.GROQ_API_KEY, budget=groq_budget)]
 
-        self.client = OpenAI(
-            api_key=self.GROQ_API_KEY,
-            base_url="https://api.groq.com/openai/v1"
-        )
+        self.llm_backends = list(llm_backends)
 
         self.headers = {
             "User-Agent": f"IRCInvestmentBot/2.0 ({user_agent_email})"
         }
+
+        if http_client is None:
+            http_client = HTTPClient()
+            http_client.register_profile("sec.gov", self.headers)
+            http_client.register_rate_limit("sec.gov", 8)
+
+        self.http_client = http_client
+        self.roster_cache = roster_cache
+        self.ticker_registry = ticker_registry
+        self.prefetch_workers = prefetch_workers
+        self.proxy_scan_chars = proxy_scan_chars
+        self.section_indexer = ProxySectionIndexer(token_budget=proxy_token_budget)
+        self.groq_budget = groq_budget
         self.cik = None
         self.company_name = None
         self.recent_filings = None
@@ -36,16 +69,43 @@ class SECCorporateRosterParser:
         """
         Maps the ticker to its 10-digit CIK and downloads the master Submissions JSON
         """
-        # 1. Fetch the master SEC ticker mapping registry
+        # 1. Resolve the ticker through the shared registry when the bot has one loaded
+        if self.ticker_registry is not None:
+            company = self.ticker_registry.lookup(self.ticker)
+
+            if company:
+                self.cik = company["cik"]
+                self.company_name = company["title"]
+                self.roster["company"] = self.company_name
+        else:
+            self.fetch_cik_from_ticker_map()
+                
+        if not self.cik:
+            raise Exception(f"Ticker '{self.ticker}' not found in SEC database.")
+
+        # 2. Download the central corporate submission registry history
+        submissions_url = f"https://data.sec.gov/submissions/CIK{self.cik}.json"
+        sub_response = self.http_client.get(submissions_url)
+        
+        if sub_response.status_code != 200:
+            raise Exception(f"Failed to pull submission data for CIK {self.cik}")
+            
+        submissions_payload = sub_response.json()
+        self.recent_filings = submissions_payload["filings"]["recent"]
+
+    def fetch_cik_from_ticker_map(self):
+        """
+        Standalone fallback: downloads the master SEC ticker mapping registry and scans it for the ticker.
+        """
         mapping_url = "https://www.sec.gov/files/company_tickers.json"
-        map_response = requests.get(mapping_url, headers=self.headers)
+        map_response = self.http_client.get(mapping_url)
         
         if map_response.status_code != 200:
             raise Exception(f"Failed to pull ticker map. SEC code: {map_response.status_code}")
             
         ticker_data = map_response.json()
         
-        # 2. Extract CIK matching the requested ticker
+        # Extract CIK matching the requested ticker
         for company_index in ticker_data.values():
             if company_index["ticker"] == self.ticker:
                 # Pad to 10 digits as required by the submissions endpoint
@@ -53,19 +113,6 @@ class SECCorporateRosterParser:
                 self.company_name = company_index["title"]
                 self.roster["company"] = self.company_name
                 break
-                
-        if not self.cik:
-            raise Exception(f"Ticker '{self.ticker}' not found in SEC database.")
-
-        # 3. Download the central corporate submission registry history
-        submissions_url = f"https://data.sec.gov/submissions/CIK{self.cik}.json"
-        sub_response = requests.get(submissions_url, headers=self.headers)
-        
-        if sub_response.status_code != 200:
-            raise Exception(f"Failed to pull submission data for CIK {self.cik}")
-            
-        submissions_payload = sub_response.json()
-        self.recent_filings = submissions_payload["filings"]["recent"]
 
     def find_target_filings(self):
         """
@@ -80,7 +127,8 @@ class SECCorporateRosterParser:
             if form == "DEF 14A":
                 target_records["proxy"] = {
                     "accession": self.recent_filings["accessionNumber"][i],
-                    "primary_doc": self.recent_filings["primaryDocument"][i]
+                    "primary_doc": self.recent_filings["primaryDocument"][i],
+                    "is_proxy": True
                 }
                 proxy_index = i
                 break
@@ -99,9 +147,10 @@ class SECCorporateRosterParser:
                         
         return target_records
 
-    def download_raw_submission_txt(self, accession_number):
+    def stream_submission_text(self, accession_number, max_chars=32000):
         """
-        Constructs and downloads the full text container file (.txt) via the SEC Archive Server
+        Streams the full text container file (.txt) from the SEC Archive Server and extracts
+        the primary document's clean text on the fly, hanging up once max_chars are collected.
         """
         unpadded_cik = str(int(self.cik)) # Folders match stripping out leading zeros
         stripped_accession = accession_number.replace("-", "")
@@ -109,62 +158,147 @@ class SECCorporateRosterParser:
         # Standard SEC format for complete container text streams
         txt_url = f"https://www.sec.gov/Archives/edgar/data/{unpadded_cik}/{stripped_accession}/{accession_number}.txt"
         
-        response = requests.get(txt_url, headers=self.headers)
+        response = self.http_client.get(txt_url, stream=True)
         if response.status_code == 200:
-            return response.text
+            return StreamingDocumentExtractor.from_response(response, max_chars=max_chars)
         else:
+            response.close()
             print(f"Warning: Unable to fetch document {accession_number}. Code: {response.status_code}")
+            return ""
+
+    def stream_primary_document_text(self, accession_number, primary_doc, max_chars=32000):
+        """
+        Streams just the filing's primary HTML document, skipping the exhibits, XBRL and
+        encoded images bundled into the full submission container.
+        Returns None if the document can't be fetched.
+        """
+        unpadded_cik = str(int(self.cik))
+        stripped_accession = accession_number.replace("-", "")
+        primary_doc_url = f"https://www.sec.gov/Archives/edgar/data/{unpadded_cik}/{stripped_accession}/{primary_doc}"
+
+        response = self.http_client.get(primary_doc_url, stream=True)
+        if response.status_code == 200:
+            return StreamingDocumentExtractor.from_response(response, max_chars=max_chars, require_text_envelope=False)
+        else:
+            response.close()
+            print(f"Warning: Unable to fetch primary document {primary_doc} for {accession_number}. Code: {response.status_code}")
             return None
 
-    def extract_document_body(self, raw_txt_content):
+    def fetch_clean_document(self, filing, max_chars=32000):
         """
-        Isolates the document text body nested within the SGML structural file wrapper tags.
+        Downloads a single filing and reduces it to clean text, preferring the primary
+        document and falling back to the full submission container.
         """
+        if filing.get("primary_doc"):
+            try:
+                clean_text = self.stream_primary_document_text(filing["accession"], filing["primary_doc"], max_chars=max_chars)
+            except requests.RequestException as e:
+                print(f"Warning: Primary document request failed for {filing['accession']}: {str(e)}")
+                clean_text = None
 
-        if not raw_txt_content:
-            return ""
+            if clean_text:
+                return clean_text
+
+            print(f"Falling back to the submission container for {filing['accession']}")
+
+        return self.stream_submission_text(filing["accession"], max_chars=max_chars)
 
-        # Pulls out content between the foundational <TEXT> envelopes
-        body_match = re.search(r"<TEXT>(.*?)</TEXT>", raw_txt_content, re.DOTALL | re.IGNORECASE)
+    def fetch_proxy_sections(self, filing):
+        """
+        Reads well past the meeting notice boilerplate of the DEF 14A and keeps only the
+        passages most likely to name directors and executive officers.
+        """
+        clean_text = self.fetch_clean_document(filing, max_chars=self.proxy_scan_chars)
+        selected_text = self.section_indexer.select(clean_text)
+        print(f"Selected {len(selected_text)} of {len(clean_text)} proxy characters for extraction.")
+        return selected_text
+
+    def prefetch_documents(self, filings):
+        """
+        Downloads and cleans every filing concurrently, since only the LLM delta step
+        has to run in order. Returns {accession: clean_text}.
+        """
+        if not filings:
+            return {}
+
+        print(f"Prefetching {len(filings)} filing documents...")
 
-        text_block = body_match.group(1) if body_match else raw_txt_content
-        text_block = re.sub(r"<style[^>]*>.*?</style>", "", text_block, flags=re.DOTALL | re.IGNORECASE)
-        text_block = re.sub(r"<script[^>]*>.*?</script>", "", text_block, flags=re.DOTALL | re.IGNORECASE)
-        text_block = re.sub(r"<[^>]+>", " ", text_block)
-        text_block = re.sub(r'\s+', ' ', text_block).strip()
+        with ThreadPoolExecutor(max_workers=self.prefetch_workers) as executor:
+            futures = {
+                filing["accession"]: executor.submit(self.fetch_proxy_sections if filing.get("is_proxy") else self.fetch_clean_document, filing)
+                for filing in filings
+            }
 
-        return text_block[:32000]
+        return {accession: future.result() for accession, future in futures.items()}
 
-    def process_with_groq(self, text_content, instruction_prompt):
+    def estimate_tokens(self, text_content):
         """
-        A centralized inference engine to process layout strings via the Groq API setup.
+        Upper-bound token estimate for one extraction call over text_content.
         """
-        try:
-            response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a precise data extraction assistant. Your job is to extract corporate governance "
-                            "rosters from SEC text and output ONLY valid JSON matching the requested schema. Do not include markdown formatting like ```json or any conversational text."
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": f"{instruction_prompt}\n\nSEC TEXT SUBMISSION:\n{text_content}"
-                    }
-                ],
-                temperature=0.0
-            )
-
-            raw_output = response.choices[0].message.content.strip()
-            raw_output = re.sub(r"^```json\s*|\s*```$", "", raw_output, flags=re.IGNORECASE)
-            return json.loads(raw_output)
-        except json.JSONDecodeError:
-            raise Exception("Groq failed to return a perfectly formatted JSON string. Try again.")
-        except Exception as e:
-            raise Exception(f"Groq API Error: {str(e)}")
+        return len(text_content) // self.chars_per_token + self.prompt_token_allowance + self.completion_token_allowance
+
+    def select_backends(self, estimated_tokens, estimated_requests):
+        """
+        Drops the backends whose quota can't cover the next estimated_tokens / estimated_requests,
+        so the pipeline starts on the first one that can. Raises the last GroqBudgetExceeded if none can.
+        """
+        if not self.llm_backends:
+            raise Exception("No LLM backend is configured.")
+
+        usable = []
+        budget_error = None
+
+        for backend in self.llm_backends:
+            try:
+                backend.admit(estimated_tokens, estimated_requests)
+                usable.append(backend)
+            except GroqBudgetExceeded as e:
+                print(f"[{self.ticker}] Skipping {backend.label} backend: {str(e)}")
+                budget_error = e
+
+        if not usable:
+            raise budget_error
+
+        self.llm_backends = usable
+
+    def process_with_groq(self, text_content, instruction_prompt, backend=None):
+        """
+        A centralized inference engine to process layout strings via the configured model backends.
+        Pass backend (e.g. "ollama") to pin a single backend for this call; otherwise each
+        backend is tried in order until one answers.
+        """
+        system_prompt = (
+            "You are a precise data extraction assistant. Your job is to extract corporate governance "
+            "rosters from SEC text and output ONLY valid JSON matching the requested schema. Do not include markdown formatting like ```json or any conversational text."
+        )
+        user_prompt = f"{instruction_prompt}\n\nSEC TEXT SUBMISSION:\n{text_content}"
+        estimated_tokens = self.estimate_tokens(text_content)
+
+        backends = self.llm_backends if backend is None else [candidate for candidate in self.llm_backends if candidate.name == backend]
+
+        if not backends:
+            raise Exception(f"No LLM backend named {backend} is configured.")
+
+        for candidate in backends:
+            is_last = candidate is backends[-1]
+
+            try:
+                raw_output = candidate.complete(system_prompt, user_prompt, estimated_tokens).strip()
+                raw_output = re.sub(r"^```json\s*|\s*```$", "", raw_output, flags=re.IGNORECASE)
+                return json.loads(raw_output)
+            except GroqBudgetExceeded as e:
+                # Raised unwrapped so the caller can report when the quota frees up
+                if is_last:
+                    raise
+                print(f"[{self.ticker}] {candidate.label} unavailable ({str(e)}); falling back...")
+            except json.JSONDecodeError:
+                if is_last:
+                    raise Exception(f"{candidate.label} failed to return a perfectly formatted JSON string. Try again.")
+                print(f"[{self.ticker}] {candidate.label} returned malformed JSON; falling back...")
+            except Exception as e:
+                if is_last:
+                    raise Exception(f"{candidate.label} API Error: {str(e)}")
+                print(f"[{self.ticker}] {candidate.label} API Error ({str(e)}); falling back...")
 
     def parse_proxy_baseline_text(self, proxy_html_text):
         """
@@ -224,10 +358,26 @@ class SECCorporateRosterParser:
             self.roster["board_members"] = updated_data.get("board_members", self.roster["board_members"])
             
             print(f"[{self.ticker}] 8-K delta state updates applied successfully.")
+            return True
+
+        except GroqBudgetExceeded:
+            # Stop the pipeline here; checkpoints so far are kept and the rest is retried later
+            raise
             
         except Exception as e:
             print(f"Warning: Failed to process 8-K update delta: {str(e)}")
             # Fall back to current roster state silently to prevent the IRC bot thread from crashing
+            return False
+
+    def save_checkpoint(self, checkpoints, accession):
+        """
+        Records the current roster as the state after `accession` and persists the chain.
+        """
+        if self.roster_cache is None:
+            return
+
+        checkpoints.append({"accession": accession, "roster": copy.deepcopy(self.roster)})
+        self.roster_cache.store(self.ticker, checkpoints[0]["accession"], checkpoints)
 
     def run_pipeline(self):
         """
@@ -241,20 +391,58 @@ class SECCorporateRosterParser:
         if not targets["proxy"]:
             print("Could not isolate a baseline Proxy filing (DEF 14A).")
             return self.roster
-            
-        # 1. Pull down and process the baseline Proxy document
-        print(f"Fetching baseline proxy document: {targets['proxy']['accession']}")
-        raw_proxy_container = self.download_raw_submission_txt(targets['proxy']['accession'])
-        clean_proxy_text = self.extract_document_body(raw_proxy_container)
-        self.parse_proxy_baseline_text(clean_proxy_text)
+
+        proxy_accession = targets["proxy"]["accession"]
+        chronological_updates = list(reversed(targets["updates"]))
+        update_accessions = [update["accession"] for update in chronological_updates]
+
+        # checkpoints[0] is the roster straight after the proxy; checkpoints[i] the roster after the i-th 8-K
+        checkpoints = []
+
+        if self.roster_cache is not None:
+            checkpoints = self.roster_cache.resume(self.ticker, proxy_accession, update_accessions)
+
+        if checkpoints and len(checkpoints) - 1 == len(update_accessions):
+            print(f"No new DEF 14A or Item 5.02 8-K filed for {self.ticker}; answering from the roster cache.")
+            self.roster = checkpoints[-1]["roster"]
+            return self.roster
+
+        pending_updates = chronological_updates[max(len(checkpoints) - 1, 0):]
+
+        # Download every document still needed up front; the deltas below read from this
+        needed_filings = list(pending_updates)
+
+        if not checkpoints:
+            needed_filings.insert(0, targets["proxy"])
+
+        documents = self.prefetch_documents(needed_filings)
+
+        # Only the next filing has to fit today's quota; checkpoints carry the rest over to a later run
+        next_accession = pending_updates[0]["accession"] if checkpoints else proxy_accession
+        self.select_backends(self.estimate_tokens(documents[next_accession]), 1)
+
+        if checkpoints:
+            print(f"Resuming {self.ticker} from checkpoint {checkpoints[-1]['accession']}...")
+            self.roster = copy.deepcopy(checkpoints[-1]["roster"])
+        else:
+            # 1. Process the baseline Proxy document
+            print(f"Parsing baseline proxy document: {proxy_accession}")
+            self.parse_proxy_baseline_text(documents[proxy_accession])
+            self.save_checkpoint(checkpoints, proxy_accession)
         
-        # 2. Apply mid-year updates chronologically (Reversed from oldest up to the newest)
-        print(f"Evaluating {len(targets['updates'])} mid-year 8-K amendments...")
-        for update in reversed(targets["updates"]):
-            print(f" -> Downloading amendment {update['accession']}...")
-            raw_update_container = self.download_raw_submission_txt(update["accession"])
-            clean_update_text = self.extract_document_body(raw_update_container)
-            self.apply_8k_delta_changes(clean_update_text)
+        # 2. Apply the unseen mid-year updates chronologically (oldest up to the newest)
+        print(f"Evaluating {len(pending_updates)} new mid-year 8-K amendments...")
+        checkpointing = bool(checkpoints)
+
+        for update in pending_updates:
+            print(f" -> Applying amendment {update['accession']}...")
+            clean_update_text = documents[update["accession"]]
+
+            if not self.apply_8k_delta_changes(clean_update_text):
+                # Later rosters would be missing this delta, so stop checkpointing and retry from here next time
+                checkpointing = False
+            elif checkpointing:
+                self.save_checkpoint(checkpoints, update["accession"])
             
         print("Pipeline Complete!\n")
         return self.roster
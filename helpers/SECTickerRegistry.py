@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+class SECTickerRegistry:
+    mapping_url = "https://www.sec.gov/files/company_tickers.json"
+
+    def __init__(self, http_client, cache_dir, refresh_interval=86400):
+        """
+        Shared ticker -> (CIK, company title) registry built from the SEC's company_tickers.json.
+        The map is persisted under cache_dir so startup doesn't need a download, and is
+        refreshed in the background with conditional requests.
+        """
+        self.http_client = http_client
+        self.path = os.path.join(cache_dir, "company_tickers.json")
+        self.refresh_interval = refresh_interval
+
+        self.companies = {}  # Schema: {"TICKER": {"cik": "0000320193", "title": "Apple Inc."}}
+        self.etag = None
+        self.last_modified = None
+
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()
+        self.stopped = threading.Event()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.load_from_disk()
+
+    def load_from_disk(self):
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path) as registry_file:
+                payload = json.load(registry_file)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable SEC ticker registry {self.path}: {e}")
+            return
+
+        with self.lock:
+            self.companies = payload.get("companies", {})
+            self.etag = payload.get("etag")
+            self.last_modified = payload.get("last_modified")
+
+        if self.companies:
+            self.loaded.set()
+            print(f"Loaded {len(self.companies)} SEC tickers from {self.path}.")
+
+    def save_to_disk(self):
+        with self.lock:
+            payload = {
+                "etag": self.etag,
+                "last_modified": self.last_modified,
+                "companies": self.companies
+            }
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+
+        with os.fdopen(fd, "w") as temp_file:
+            json.dump(payload, temp_file)
+
+        os.replace(temp_path, self.path)
+
+    def refresh(self):
+        """
+        Revalidates the registry against the SEC; only downloads the map when it has changed.
+        """
+        headers = {}
+
+        if self.companies:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+
+        mapping_url = self.mapping_url
+        response = self.http_client.get(mapping_url, headers=headers, revalidate=False)
+
+        if response.status_code == 304:
+            logger.debug("SEC ticker registry is up to date.")
+            return
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to pull ticker map. SEC code: {response.status_code}")
+
+        companies = {
+            item["ticker"].upper(): {
+                "cik": str(item["cik_str"]).zfill(10),
+                "title": item["title"]
+            }
+            for item in response.json().values()
+        }
+
+        with self.lock:
+            self.companies = companies
+            self.etag = response.headers.get("ETag")
+            self.last_modified = response.headers.get("Last-Modified")
+
+        self.loaded.set()
+        self.save_to_disk()
+        print(f"Successfully cached {len(companies)} SEC tickers.")
+
+    def start(self):
+        threading.Thread(target=self._refresh_loop, name="sec-ticker-registry", daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _refresh_loop(self):
+        while not self.stopped.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Failed to refresh SEC ticker map: {e}")
+
+            self.stopped.wait(self.refresh_interval)
+
+    def lookup(self, ticker, timeout=30):
+        """
+        Returns {"cik", "title"} for a ticker, or None if the SEC doesn't know it.
+        On a cold start with no disk copy, waits up to `timeout` seconds for the first download.
+        """
+        self.loaded.wait(timeout)
+        return self.companies.get(ticker.upper().strip())
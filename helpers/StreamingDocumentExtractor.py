@@ -0,0 +1,90 @@
+import codecs
+import re
+from html.parser import HTMLParser
+
+class StreamingDocumentExtractor(HTMLParser):
+    skipped_tags = {"style", "script"}
+
+    def __init__(self, max_chars=32000, require_text_envelope=True):
+        """
+        Incremental tag stripper for SEC filings: feed() it chunks as they arrive and
+        stop reading once `done` is set.
+
+        With require_text_envelope, only the first <TEXT>...</TEXT> block of an SGML
+        submission container is kept (the primary document); anything after it, such as
+        exhibits and uuencoded graphics, is never read.
+        """
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.inside_text = not require_text_envelope
+        self.skip_depth = 0
+        self.nested_text_depth = 0  # SVG <text> elements inside the document body
+        self.parts = []
+        self.char_count = 0
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "text" and not self.inside_text:
+            self.inside_text = True
+        elif tag == "text":
+            self.nested_text_depth += 1
+        elif tag in self.skipped_tags:
+            self.skip_depth += 1
+        else:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag == "text" and self.nested_text_depth:
+            self.nested_text_depth -= 1
+        elif tag == "text" and self.inside_text:
+            self.done = True
+        elif tag in self.skipped_tags:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        else:
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if self.done or not self.inside_text or self.skip_depth:
+            return
+
+        data = re.sub(r"\s+", " ", data)
+        self.parts.append(data)
+        self.char_count += len(data)
+
+        # Collapsing whitespace across pieces can only shrink the text, so leave a little slack
+        if self.char_count >= self.max_chars * 1.1:
+            self.done = True
+
+    def text(self):
+        text_block = re.sub(r"\s+", " ", "".join(self.parts)).strip()
+        return text_block[:self.max_chars]
+
+    @classmethod
+    def from_string(cls, raw_content, **kwargs):
+        extractor = cls(**kwargs)
+        extractor.feed(raw_content)
+        extractor.close()
+        return extractor.text()
+
+    @classmethod
+    def from_response(cls, response, chunk_size=16384, **kwargs):
+        """
+        Reads a streamed requests response until enough clean text has been collected,
+        then closes it so the rest of the body is never downloaded.
+        """
+        extractor = cls(**kwargs)
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                extractor.feed(decoder.decode(chunk))
+
+                if extractor.done:
+                    break
+            else:
+                extractor.feed(decoder.decode(b"", final=True))
+                extractor.close()
+        finally:
+            response.close()
+
+        return extractor.text()
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+class TTLCache:
+    def __init__(self, ttl=15, max_entries=256):
+        """
+        In-process cache with a per-entry time-to-live and LRU eviction.
+        Concurrent misses on the same key share a single loader call.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.entries = OrderedDict()  # Schema: {key: (expires_at, value)}
+        self.in_flight = {}           # Schema: {key: Future}
+        self.lock = threading.Lock()
+
+    def get(self, key, loader, ttl=None):
+        """
+        Returns the cached value for key, calling loader() on a miss.
+        None results and loader exceptions are handed to every waiter but never cached.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                return entry[1]
+
+            future = self.in_flight.get(key)
+            is_owner = future is None
+
+            if is_owner:
+                future = Future()
+                self.in_flight[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            if value is not None:
+                self.entries[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+                self.entries.move_to_end(key)
+
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+
+            self.in_flight.pop(key, None)
+
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
@@ -0,0 +1,49 @@
+import threading
+import time
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """
+        Thread-safe token bucket: refills `rate` tokens per second up to `capacity`.
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, tokens=1):
+        with self.lock:
+            self._refill()
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+
+            return False
+
+    def wait_time(self, tokens=1):
+        """Seconds until `tokens` would be available."""
+        with self.lock:
+            self._refill()
+            return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def acquire(self, tokens=1, timeout=None):
+        """Blocks until `tokens` are available; returns False if that takes longer than timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            if self.try_acquire(tokens):
+                return True
+
+            delay = self.wait_time(tokens)
+
+            if deadline is not None and time.monotonic() + delay > deadline:
+                return False
+
+            time.sleep(delay)
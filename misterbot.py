@@ -8,16 +8,13 @@ from datetime import datetime, timedelta
 import logging
 import socket
 import re
-import requests
-from bs4 import BeautifulSoup
 from user_agent import generate_user_agent
-import tempfile
 import os
 import time
-from urllib.parse import urlparse, quote, quote_plus
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode, quote, quote_plus
 import yfinance as yf
-from multiprocessing import Process, Queue
-from playwright.sync_api import sync_playwright, TimeoutError
+from concurrent.futures import ThreadPoolExecutor, wait, TimeoutError as FuturesTimeoutError
+from playwright.sync_api import TimeoutError
 from playwright._impl._errors import Error as PlaywrightError
 from playwright_stealth.stealth import Stealth
 import math
@@ -27,6 +24,21 @@ import random
 import traceback
 from lxml import etree, html
 from helpers.SECCorporateRosterParser import SECCorporateRosterParser
+from helpers.LLMBackends import GroqBackend, OllamaBackend
+from helpers.CommandDispatcher import CommandDispatcher
+from helpers.BrowserPool import BrowserPool
+from helpers.HTTPClient import HTTPClient
+from helpers.TTLCache import TTLCache
+from helpers.StaticPreviewer import StaticPreviewer
+from helpers.APIPreviewer import APIPreviewer
+from helpers.DocumentPreviewer import DocumentPreviewer
+from helpers.RenderPolicy import RenderPolicy, RenderPolicyRegistry
+from helpers.BatchQuoteFetcher import BatchQuoteFetcher
+from helpers.QuoteExtractor import cnbc_quote_strip, cnbc_bond_summary, ft_tearsheet_overview
+from helpers.MarketSnapshotPoller import MarketSnapshotPoller
+from helpers.RosterCache import RosterCache
+from helpers.SECTickerRegistry import SECTickerRegistry
+from helpers.GroqBudget import GroqBudget, GroqBudgetExceeded
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -91,6 +103,9 @@ class IRCBot(irc.client.SimpleIRCClient):
         self.GROQ_LOCK_ACTIVE = False
         self.GROQ_UNLOCK_TIMESTAMP = None
 
+        # Proactive client-side budget shared by every .mgmt pipeline
+        self.groq_budget = GroqBudget(**config.get('groq_limits', {}))
+
         self._channel = None
         self._target_user = None
         self.nickserv_requests = {}
@@ -117,51 +132,137 @@ class IRCBot(irc.client.SimpleIRCClient):
             '.c': self.handle_crypto_prices,
             '.futures': self.handle_futures_prices,
             '.mgmt': self.get_mgmt,
+            '.quota': self.handle_groq_quota,
             '.help': self.display_help_prompt
         }
         # Flag to track SASL success
 
-        self.preload_sec_ticker_map()
-
-    def preload_sec_ticker_map(self):
-        global TICKER_TO_CIK_CACHE
-
-        headers = {
+        # One pooled keep-alive client for every outbound HTTP call
+        self.http_client = HTTPClient(
+            timeout=config.get('http_timeout', 15),
+            max_sessions=config.get('http_max_sessions', 32),
+            max_cached_total_bytes=config.get('http_cache_bytes', 64 * 1024 * 1024)
+        )
+        self.http_client.register_profile("sec.gov", {
             "User-Agent": f"IRCInvestmentBot/1.0 ({self.owner_email})"
-        }
+        })
+        self.http_client.register_rate_limit("sec.gov", config.get('sec_requests_per_second', 8))
 
-        map_url = "https://www.sec.gov/files/company_tickers.json"
+        for host in ["cnbc.com", "ft.com", "coinmarketcap.com"]:
+            self.http_client.register_profile(host, {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36'
+            })
+
+        # Handlers run on worker threads; the reactor thread only parses messages and answers PINGs
+        self.dispatcher = CommandDispatcher(
+            max_workers=config.get('worker_threads', 4),
+            max_pending=config.get('max_pending_commands', 16),
+            outbound_options={
+                'lines_per_second': config.get('flood_lines_per_second', 0.5),
+                'burst': config.get('flood_burst', 4)
+            },
+            max_reply_lines=config.get('max_reply_lines', 10)
+        )
+
+        # Separate pool for per-symbol fan-out so snapshot commands can't starve the command workers
+        self.fetch_executor = ThreadPoolExecutor(max_workers=config.get('fetch_threads', 16), thread_name_prefix="misterbot-fetch")
+        self.snapshot_deadline = config.get('snapshot_deadline', 8)
+
+        # Short-lived yfinance Ticker.info cache; repeat lookups of hot tickers skip the quoteSummary call
+        self.quote_cache = TTLCache(ttl=config.get('quote_cache_ttl', 15), max_entries=config.get('quote_cache_size', 256))
+        self.batch_quote_fetcher = BatchQuoteFetcher()
+
+        # Fixed-list market replies are rebuilt in the background and served from memory
+        self.market_snapshots = MarketSnapshotPoller(
+            interval=config.get('market_snapshot_interval', 60),
+            off_hours_interval=config.get('market_snapshot_off_hours_interval', 900)
+        )
+        self.market_snapshots.register('markets', self.build_market_snapshot)
+        self.market_snapshots.register('bonds', self.build_bond_snapshot)
+        self.market_snapshots.register('oil', self.build_oil_snapshot)
+        self.market_snapshots.register('currency', self.build_currency_snapshot)
+        self.market_snapshots.register('futures', self.build_futures_snapshot)
+
+        # Rendered link previews, so a URL pasted into several channels is only rendered once
+        self.preview_cache = TTLCache(ttl=config.get('preview_cache_ttl', 900), max_entries=config.get('preview_cache_size', 512))
+
+        # Cheap first tiers for link previews: document metadata and the page's static <head>, before any browser is involved
+        self.document_previewer = DocumentPreviewer(self.http_client, tail_bytes=config.get('document_tail_bytes', 65536))
+        self.static_previewer = StaticPreviewer(
+            self.http_client,
+            document_previewer=self.document_previewer,
+            max_bytes=config.get('static_preview_bytes', 65536),
+            timeout=config.get('static_preview_timeout', 5),
+            extra_browser_domains=config.get('browser_only_domains', [])
+        )
+        self.api_previewer = APIPreviewer(self.http_client, timeout=config.get('static_preview_timeout', 5))
+        self.render_policies = self.build_render_policies()
+
+        # Persistent state (rosters, registries) lives under cache_dir
+        self.cache_dir = config.get('cache_dir', os.path.join(os.getcwd(), 'cache'))
+        self.roster_cache = RosterCache(self.cache_dir)
+        self.sec_ticker_refresh_interval = config.get('sec_ticker_refresh_interval', 86400)
+        self.proxy_token_budget = config.get('proxy_token_budget', 6000)
+
+        # Model backends for .mgmt, primary first; the fallback keeps it answering while Groq is locked
+        self.llm_backends = self.build_llm_backends(config.get('llm', {}))
+
+        # Warm Chromium instances shared by every link preview
+        self.browser_pool = BrowserPool(
+            size=config.get('browser_pool_size', 2),
+            max_pages_per_browser=config.get('browser_max_pages', 50),
+            per_domain_limit=config.get('browser_per_domain_limit', 2),
+            context_options=self.browser_context_options
+        )
 
-        try:
-            response = requests.get(map_url, headers=headers)
+        self.preload_sec_ticker_map()
+        self.market_snapshots.start()
+
+    def build_llm_backends(self, llm_config):
+        """Creates the configured primary LLM backend and its optional fallback."""
+        factories = {
+            'groq': lambda: GroqBackend(
+                self.GROQ_API_KEY,
+                model=llm_config.get('groq_model', 'llama-3.3-70b-versatile'),
+                budget=self.groq_budget,
+                timeout=llm_config.get('groq_timeout', 60)
+            ),
+            'ollama': lambda: OllamaBackend(
+                self.http_client,
+                url=llm_config.get('ollama_url', ollama_server_url),
+                model=llm_config.get('ollama_model', 'llama3.1'),
+                timeout=llm_config.get('ollama_timeout', 300),
+                num_ctx=llm_config.get('ollama_num_ctx', 8192)
+            )
+        }
+        names = [llm_config.get('backend', 'groq')]
 
-            if response.status_code == 200:
-                ticker_map = response.json()
+        if llm_config.get('fallback') and llm_config['fallback'] not in names:
+            names.append(llm_config['fallback'])
 
-                TICKER_TO_CIK_CACHE = {
-                    item["ticker"].upper(): str(item["cik_str"]).zfill(10)
-                    for item in ticker_map.values()
-                }
+        return [factories[name]() for name in names]
 
-                print(f"Successfully cached {len(TICKER_TO_CIK_CACHE)} SEC tickers.")
-        except Exception as e:
-            print(f"Failed to preload SEC map: {e}")
+    def preload_sec_ticker_map(self):
+        """Loads the persisted SEC ticker registry and keeps it fresh in the background."""
+        self.sec_ticker_registry = SECTickerRegistry(
+            self.http_client,
+            self.cache_dir,
+            refresh_interval=self.sec_ticker_refresh_interval
+        )
+        self.sec_ticker_registry.start()
 
     def get_cik_from_ticker(self, ticker):
-        return TICKER_TO_CIK_CACHE.get(ticker.upper().strip())
+        company = self.sec_ticker_registry.lookup(ticker)
+        return company["cik"] if company else None
 
     def fetch_sec_company_facts(self, ticker):
-        headers = {
-            "User-Agent": f"IRCInvestmentBot/1.0 ({self.owner_email})"
-        }
-
         cik = self.get_cik_from_ticker(ticker)
 
         if cik is None:
             return f"Error: ticker '{ticker.upper()}' not found in SEC registry."
 
         facts_url = f"https://data.sec.gov/api/xbrl/companyfacts/cik{cik}.json"
-        facts_response = requests.get(facts_url, headers=headers)
+        facts_response = self.http_client.get(facts_url)
 
         if facts_response.status_code == 200:
             return facts_response.json()
@@ -169,17 +270,13 @@ class IRCBot(irc.client.SimpleIRCClient):
             return f"SEC facts endpoint returned error code: {facts_response.status_code}"
 
     def fetch_sec_company_submissions(self, ticker):
-        headers = {
-            "User-Agent": f"IRCInvestmentBot/1.0 ({self.owner_email})"
-        }
-
         cik = self.get_cik_from_ticker(ticker)
 
         if cik is None:
             return f"Error: ticker '{ticker.upper()}' not found in SEC registry."
 
         submissions_url = f"https://data.sec.gov/submissions/CIK{cik}.json"
-        submissions_response = requests.get(submissions_url, headers=headers)
+        submissions_response = self.http_client.get(submissions_url)
 
         if submissions_response.status_code == 200:
             return submissions_response.json()
@@ -205,37 +302,6 @@ class IRCBot(irc.client.SimpleIRCClient):
             n /= 1000.0
         return '{:.1f}{}'.format(n, suffixes[magnitude])
 
-    def extract_metadata(self, docx_file):
-        import docx
-
-        doc = docx.Document(docx_file)  # Create a Document object from the Word document file.
-        core_properties = doc.core_properties  # Get the core properties of the document.
-        metadata = {}  # Initialize an empty dictionary to store metadata
-        # Extract core properties
-        for prop in dir(core_properties):  # Iterate over all properties of the core_properties object.
-            if prop.startswith('__'):  # Skip properties starting with double underscores (e.g., __elenent). Not needed
-                continue
-            value = getattr(core_properties, prop)  # Get the value of the property.
-            if callable(value):  # Skip callable properties (methods).
-                continue
-            if prop == 'created' or prop == 'modified' or prop == 'last_printed':  # Check for datetime properties.
-                if value:
-                    value = value.strftime('%Y-%m-%d %H:%M:%S')  # Convert datetime to string format.
-                else:
-                    value = None
-            metadata[prop] = value  # Store the property and its value in the metadata dictionary.
-        # Extract custom properties (if available).
-        try:
-            custom_properties = core_properties.custom_properties  # Get the custom properties (if available).
-            if custom_properties:  # Check if custom properties exist.
-                metadata['custom_properties'] = {}  # Initialize a dictionary to store custom properties.
-                for prop in custom_properties:  # Iterate over custom properties.
-                    metadata['custom_properties'][prop.name] = prop.value  # Store the custom property name and value.
-        except AttributeError:
-            # Custom properties not available in this version.
-            pass  # Skip custom properties extraction if the attribute is not available.
-        return metadata  # Return the metadata dictionary.
-
     def on_all_raw_messages(self, connection, event):
         raw_message = event.arguments[0]
 
@@ -258,6 +324,11 @@ class IRCBot(irc.client.SimpleIRCClient):
             connection.join(channel)
             logger.info(f"Joined channel {channel}")
 
+    def on_join(self, connection, event):
+        """Our own JOIN echo carries the user@host other clients see us as."""
+        if event.source.nick == connection.get_nickname():
+            self.dispatcher.set_userhost(connection, event.source.userhost)
+
     def on_ping(self, connection, event):
         ping_arg = event.arguments[0]
         #pong_response = f":{ping_arg}" if not ping_arg.startswith(":") else ping_arg
@@ -269,6 +340,11 @@ class IRCBot(irc.client.SimpleIRCClient):
         """Called when bot disconnects."""
         logger.error("Disconnected from server")
         self.sasl_authenticated = False
+        self.dispatcher.shutdown()
+        self.fetch_executor.shutdown(wait=False, cancel_futures=True)
+        self.browser_pool.shutdown()
+        self.sec_ticker_registry.stop()
+        self.market_snapshots.stop()
         main()
 
     def on_sasl_authenticated(self, connection, event):
@@ -294,7 +370,7 @@ class IRCBot(irc.client.SimpleIRCClient):
 
                 for user, (requester, _) in self.nickserv_requests.items():
                     if user == self._target_user:
-                        connection.privmsg(self._channel,
+                        self.dispatcher.reply_connection(connection).privmsg(self._channel,
                             f"{requester}: {user} was last seen {last_seen_info}")
 
                         break
@@ -321,8 +397,36 @@ class IRCBot(irc.client.SimpleIRCClient):
 
         self.GROQ_UNLOCK_TIMESTAMP = datetime.now() + timedelta(seconds=total_seconds)
         self.GROQ_LOCK_ACTIVE = True
+        self.groq_budget.block_for(total_seconds)
         logger.debug(f"Groq daily limit triggered. Lock active until: {self.GROQ_UNLOCK_TIMESTAMP.strftime('%H:%M:%S')}")
 
+    def dispatch(self, connection, channel, handler, *args):
+        """Hands work off to the worker pool, telling the channel if the pool is saturated."""
+        if not self.dispatcher.submit(connection, handler, *args):
+            logger.debug(f"Worker pool saturated, dropping {getattr(handler, '__name__', handler)} for {channel}")
+            self.dispatcher.reply_connection(connection).privmsg(channel, "I'm busy processing other requests. Please try again shortly.")
+
+    def run_command(self, connection, command, sender, message, channel):
+        """Runs a command handler on a worker thread."""
+        try:
+            self.command_handlers[command](connection, sender, message, channel)
+        except Exception as e:
+            if command not in self.custom_error_commands:
+                logger.error(f"Error handling command {command} in {channel} from on_pubmsg: {e}")
+                str_traceback = traceback.format_exc()
+                logger.error(f"Traceback: {str_traceback}")
+                connection.privmsg(channel, f"Error processing command {command}: {e}")
+
+            # Intercept and process API structural limit exceptions thrown from our parser helper pipeline
+            if "groq api error" in str(e).lower() and ("429" in str(e) or "rate_limit" in str(e).lower()):
+                self.calculate_groq_lockout(str(e))
+                connection.privmsg(channel, "Groq API daily token/request exhaustion triggered. The management command has been safely isolated.")
+
+    def run_links(self, connection, urls, channel):
+        """Previews every URL in a message on a worker thread."""
+        for url in urls:
+            self.output_link(url, connection, channel)
+
     def on_pubmsg(self, connection, event):
         """Handle public channel messages."""
         message = event.arguments[0]
@@ -334,45 +438,28 @@ class IRCBot(irc.client.SimpleIRCClient):
         if message.startswith('!'):
             command = message.split()[0]
             if command in self.command_handlers:
-                try:
-                    self.command_handlers[command](connection, sender, message, channel)
-                except Exception as e:
-                    logger.error(f"Error handling command {command} in {channel} from on_pubmsg: {e}")
-                    connection.privmsg(channel, f"Error processing command {command}: {e}")
+                self.dispatch(connection, channel, self.run_command, command, sender, message, channel)
         elif re.match('^\.[a-z]{1,}', message):
             command = message.split()[0]
             if command in self.command_handlers:
 
-                # Check dynamic rate limit lock state prior to execution
-                if command == '.mgmt' and self.GROQ_LOCK_ACTIVE and self.GROQ_UNLOCK_TIMESTAMP:
+                # Check dynamic rate limit lock state prior to execution; with a fallback backend .mgmt keeps working
+                if command == '.mgmt' and self.GROQ_LOCK_ACTIVE and self.GROQ_UNLOCK_TIMESTAMP and len(self.llm_backends) == 1:
                     if datetime.now() < self.GROQ_UNLOCK_TIMESTAMP:
                         remaining_delta = self.GROQ_UNLOCK_TIMESTAMP - datetime.now()
                         mins, secs = divmod(int(remaining_delta.total_seconds()), 60)
-                        connection.privmsg(channel, f"Error: Groq API limit reached. Command .mgmt locked. Retry available in {mins:02d}:{secs:02d}.")
+                        self.dispatcher.reply_connection(connection).privmsg(channel, f"Error: Groq API limit reached. Command .mgmt locked. Retry available in {mins:02d}:{secs:02d}.")
                         return
                     else:
                         # Clear old lock cleanly if the cooldown timeline has lapsed
                         self.GROQ_LOCK_ACTIVE = False
                         self.GROQ_UNLOCK_TIMESTAMP = None
 
-                try:
-                    self.command_handlers[command](connection, sender, message, channel)
-                except Exception as e:
-                    if command not in self.custom_error_commands:
-                        logger.error(f"Error handling command {command} in {channel} from on_pubmsg: {e}")
-                        str_traceback = traceback.format_exc()
-                        logger.error(f"Traceback: {str_traceback}")
-                        connection.privmsg(channel, f"Error processing command {command}: {e}")
-
-                    # Intercept and process API structural limit exceptions thrown from our parser helper pipeline
-                    if "groq api error" in str(e).lower() and ("429" in str(e) or "rate_limit" in str(e).lower()):
-                        self.calculate_groq_lockout(str(e))
-                        connection.privmsg(channel, "Groq API daily token/request exhaustion triggered. The management command has been safely isolated.")
+                self.dispatch(connection, channel, self.run_command, command, sender, message, channel)
             else:
-                connection.privmsg(channel, f"{command} has not been implemented yet. To view a list of available commands, type .help.")
+                self.dispatcher.reply_connection(connection).privmsg(channel, f"{command} has not been implemented yet. To view a list of available commands, type .help.")
         elif len(urls) > 0:
-            for url in urls:
-                self.output_link(url, connection, channel)
+            self.dispatch(connection, channel, self.run_links, urls, channel)
 
     def human_like_interaction(self, page):
         page.mouse.move(100, 100)
@@ -382,284 +469,409 @@ class IRCBot(irc.client.SimpleIRCClient):
         page.evaluate("window.scrollBy(0, window.innerHeight / 2)")
         time.sleep(random.uniform(1, 2))
 
-    def run_playwright(self, url, queue):
-        """Run Playwright in a separate process to fetch page metadata."""
+    def browser_context_options(self):
+        """Options for each fresh browser context handed out by the browser pool."""
+        return {
+            "user_agent": (
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/140.0.0.0 Safari/537.36"
+            ),
+            "locale": "en-GB",
+            "viewport": {"width": 1280, "height": math.floor(random.random() * 100)},
+            "java_script_enabled": True,
+            "color_scheme": "light",
+            "timezone_id": "Europe/Paris",
+        }
+
+    def build_render_policies(self):
+        """Per-site rendering rules for the browser tier of the link previewer."""
+        registry = RenderPolicyRegistry(RenderPolicy(
+            "default",
+            wait_until="load",
+            stealth=True,
+            extractor=self.extract_default_title,
+            time_budget=20
+        ))
+
+        registry.register(RenderPolicy(
+            "fixupx",
+            domains=["fixupx.com"],
+            wait_for_selector="article",
+            stealth=True,
+            extractor=self.extract_tweet_preview
+        ))
+        registry.register(RenderPolicy(
+            "x",
+            domains=["x.com", "twitter.com", "xcancel.com"],
+            wait_for_selector="[data-testid=\"UserName\"]",
+            stealth=True,
+            extractor=self.extract_x_profile
+        ))
+        registry.register(RenderPolicy(
+            "bluesky",
+            host_pattern=r"^bsky\.|\.bsky\.",
+            wait_for_selector="div[data-testid*=\"postThreadItem-by-\"]",
+            extractor=self.extract_bluesky_preview
+        ))
+        registry.register(RenderPolicy(
+            "archive",
+            host_pattern=r"^archive\.",
+            stealth=True,
+            extractor=self.extract_archive_title,
+            time_budget=20
+        ))
+        registry.register(RenderPolicy(
+            "ft",
+            domains=["ft.com"],
+            stealth=True,
+            extractor=self.extract_ft_preview
+        ))
+        registry.register(RenderPolicy(
+            "youtube",
+            domains=["youtube.com", "youtu.be"],
+            wait_for_selector="ytd-channel-name a",
+            extractor=self.extract_youtube_preview
+        ))
+        registry.register(RenderPolicy(
+            "instagram",
+            domains=["instagram.com"],
+            wait_for_selector="img",
+            stealth=True,
+            extractor=self.extract_instagram_preview,
+            allowed_resources={"image"}
+        ))
+
+        return registry
+
+    def run_playwright(self, url, timeout=60):
+        """Render a URL on a warm pooled browser to fetch page metadata."""
+        policy = self.render_policies.policy_for(url)
+        future = self.browser_pool.render(url, lambda context, page: self.extract_page_preview(context, page, url, policy), timeout=timeout)
+
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                context = browser.new_context(
-                    user_agent=(
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/140.0.0.0 Safari/537.36"
-                    ),
-                    locale="en-GB",
-                    viewport={"width": 1280, "height": math.floor(random.random() * 100)},
-                    java_script_enabled=True,
-                    color_scheme="light",
-                    timezone_id="Europe/Paris",
-                )
-                page = context.new_page()
-                stealth_manager = Stealth()
-                stealth_manager.apply_stealth_sync(page)
-                tempdir = tempfile.gettempdir()
-                is_document = False
+            return future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Playwright render failed for {url}: {e}")
+            raise
 
-                try:
-                    response = page.goto(url, wait_until="networkidle", timeout=10000)
-                except PlaywrightError:
-                    response = page.request.get(url, timeout=10000)
-                    is_document = True
-
-                if not is_document:
-                    self.human_like_interaction(page)
-                    page.reload()
-
-                content_type = response.headers.get("content-type", "")
-                basename = os.path.basename(url)
-                message = ""
-
-                if "application/pdf" in content_type:
-                    content_bytes = response.body()
-                    with open(os.path.join(tempdir, basename), "wb") as f:
-                        f.write(content_bytes)
-                        title = os.popen(f"pdfinfo {f.name} | grep 'Title:'").read()
-                        title = re.sub(r"Title:\s+", "", title)
-                        f.close()
-                        os.unlink(f.name)
-                        if title == '':
-                            title = basename
-                        title = title.replace("\r", "").replace("\n", "")
-                        message = f"[ {title} ]"
-                elif content_type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
-                    content_bytes = response.body()
-                    with open(os.path.join(tempdir, os.path.basename(url)), "wb") as f:
-                        f.write(content_bytes)
-                        metadata = self.extract_metadata(f.name)
-                        title = metadata.get('title', '')
-                        author = metadata.get('author', '')
-                        created = metadata.get('created', '')
-                        last_modified = metadata.get('last_modified', '')
-                        last_modified_by = metadata.get('last_modified_by', '')
-                        f.close()
-                        os.unlink(f.name)
-                        if title == '':
-                            title = basename
-                        title = title.replace("\r", "").replace("\n", "")
-                        message = f"[ Title: {title} ] [ Author: {author} ] [ Created: {created} ] [ Last Modified: {last_modified} ] [ Last Modified By: {last_modified_by} ]"
-
-                page_title = page.title()
-                default_title = ""
-                actual_url = page.url
-                logger.debug(f"The URL: {actual_url}")
-
-                if "https://www.google.com/url?q=" in actual_url:
-                    actual_url = re.sub(r'^https:\/\/www\.google\.com\/url\?q=', '', actual_url)
-                    response = page.goto(actual_url, wait_until="networkidle", timeout=10000)
-                    actual_url = page.url
-                    page_title = page.title()
-
-                if "consent.yahoo.com" in actual_url:
-                    try:
-                        page.wait_for_selector("//button[contains(@class,'accept-all')]", timeout=15000)
-                        logger.debug("✅ Found Yahoo popup accept cookies button")
-                        accept_all_button = page.locator("//button[contains(@class,'accept-all')]")
-
-                        with page.expect_navigation(wait_until="domcontentloaded", timeout=30000):
-                            page.evaluate('''accept_all_button => {
-                                accept_all_button.click()
-                            }''', accept_all_button.element_handle())
-                    
-                        logger.debug("✅ Clicked Yahoo popup accept cookies button")
-                        title = page.title()
-                        message = f"[ {title} ]"
-                    except TimeoutError:
-                        logger.debug("Timeout waiting for Yahoo page to redirect.")
-
-                if "x.com" in url and "fixupx.com" not in url:
-                    logger.debug(f"The page title: {page_title}")
-
-                    try:
-                        page.wait_for_selector("[data-testid=\"UserName\"]", timeout=15000)
-                        logger.debug("✅ Found tweeter username")
-                        username_wrapper = page.query_selector('[data-testid="UserName"] > div > div > div > div')
-                        title = username_wrapper.inner_text() if username_wrapper else page_title
-                        message = f"[ {title} ]"
-                    except TimeoutError:
-                        logger.debug("Timeout waiting for tweeter username.")
-
-                if "fixupx.com" in url:
-                    try:
-                        page.wait_for_selector("article", timeout=15000)
-                        logger.debug("✅ Found main tweet")
-                        meta = page.query_selector('meta[property="og:title"]')
-                        title = meta.get_attribute("content") if meta else None
-                        meta2 = page.query_selector('meta[property="og:description"]')
-                        description = meta2.get_attribute("content") if meta2 else None
-                        if title:
-                            logger.debug("✅ Found tweet author")
-                            title = title.replace("\r", "").replace("\n", "")
-                            title = re.sub(r'\u200b', '', title)
-                            if description:
-                                logger.debug("✅ Found tweet content")
-                                description = description.replace("\r", "").replace("\n", "")
-                                message = f"[ {title}: {description} ]"
-                            else:
-                                description = "Check the tweet for any attached media."
-                                message = f"[ {title}: {description} ]"
-                    except TimeoutError:
-                        logger.debug("Timeout waiting for tweet content.")
-
-                if "bsky." in url:
-                    try:
-                        page.wait_for_selector("div[data-testid*=\"postThreadItem-by-\"]", timeout=15000)
-                        logger.debug("✅ Found main Bluesky post")
-                        meta = page.query_selector('meta[property="og:title"]')
-                        title = meta.get_attribute("content") if meta else None
-                        meta2 = page.query_selector('meta[property="og:description"]')
-                        description = meta2.get_attribute("content") if meta2 else None
-                        if title:
-                            logger.debug("✅ Found Bluesky post author")
-                            title = title.replace("\r", "").replace("\n", "")
-                            if description:
-                                logger.debug("✅ Found Bluesky post content")
-                                description = description.replace("\r", "").replace("\n", "")
-                                message = f"[ {title}: {description} ]"
-                                logger.debug(f"The byte count of the string: {len(message.encode('utf-8'))}")
-
-                                if len(message.encode('utf-8')) >= 495:
-                                    message = message[:447] + '...'
-                                    logger.debug(f"The byte count of the string: {len(message.encode('utf-8'))}")
-                            else:
-                                description = "Check the Bluesky post for any attached media."
-                                message = f"[ {title}: {description} ]"
-                    except TimeoutError:
-                        logger.debug("Timeout waiting for Bluesky post content.")
-
-                if re.match(r'^(?:https:\/\/)?archive\.', url):
-                    default_title = re.sub(r'^https:\/\/', '', url)
-                    default_title = re.sub(r'\/$', '', default_title)
-                    try:
-                        page.wait_for_function(
-                            f"document.title !== '{default_title}'",
-                            timeout=15000
-                        )
-                        page_title = page.title()
-                    except TimeoutError:
-                        logger.debug("Timeout waiting for archive.* title to change.")
-
-                if "ft.com" in url and "Subscribe to read" in page_title:
-                    try:
-                        page.wait_for_selector("blockquote", timeout=15000)
-                        logger.debug("✅ Found main blockquote")
-                        blockquote = page.query_selector('blockquote')
-                        title = blockquote.inner_text() if blockquote else "Subscribe to read"
-                        message = f"[ {title} ]"
-                    except TimeoutError:
-                        logger.debug("Timeout waiting for FT blockquote.")
-
-                if "youtube.com" in url:
-                    try:
-                        page.wait_for_selector("ytd-channel-name a", timeout=15000)
-                        logger.debug("✅ Found main channel name")
-                        channel_element = page.query_selector('ytd-channel-name a')
-                        title = page_title
-
-                        if channel_element:
-                            logger.debug("✅ Found main channel name element")
-                            channel_name = channel_element.inner_text().strip()
-                            new_title = re.sub(r"- YouTube$", "- " + channel_name, title)
-
-                            if title != new_title:
-                                title = new_title
-
-                            if title.startswith('-'):
-                                title_element = page.query_selector('#title > h1 > yt-formatted-string')
-                                title_element_text = title_element.inner_text().strip()
-                                title = title_element_text + ' ' + title
-
-                        message = f"[ {title} ]"
-                    except TimeoutError:
-                        logger.debug("Timeout waiting for YouTube channel name.")
-
-                if "instagram.com" in url:
-                    try:
-                        page.wait_for_selector("img", timeout=15000)
-                        logger.debug("✅ Found image")
-                        img = page.query_selector('img')
-                        description = img.get_attribute("alt") if img else None
-                        author = page.query_selector('//div[text()="Follow"]/../preceding-sibling::*[1]')
-                        title = "Instagram"
-                        if author:
-                            author = author.inner_text()
-                        message = f"[ {author}: {description} ]"
-                    except TimeoutError:
-                        logger.debug("Timeout waiting for Instagram content.")
-
-                if len(message) < 1:
-                    message = f"[ {page_title} ]"
+    @staticmethod
+    def remaining_ms(deadline, floor=1000):
+        """Milliseconds left before a render deadline, never less than floor."""
+        return max(floor, int((deadline - time.monotonic()) * 1000))
 
-                try:
-                    page.screenshot(path="screenshot.png", full_page=True, timeout=10000)
-                except:
-                    pass
+    def extract_page_preview(self, context, page, url, policy):
+        """Runs on a browser pool thread with a fresh context and page, following the URL's render policy."""
+        deadline = time.monotonic() + policy.time_budget
 
-                html = page.content()
+        if policy.stealth:
+            stealth_manager = Stealth()
+            stealth_manager.apply_stealth_sync(page)
 
-                with open('./html.txt', 'w') as html_file:
-                    print(html, file=html_file)
-                    html_file.close()
+        # Skip images, media, fonts and trackers; the preview only reads the title and a few tags
+        context.route("**/*", policy.route)
 
-                browser.close()
-                queue.put(message)
-        except Exception as e:
-            logger.error(f"Playwright process failed for {url}: {e}")
-            queue.put(f"Error processing {url}: {str(e)}")
+        try:
+            response = page.goto(url, wait_until=policy.wait_until, timeout=self.remaining_ms(deadline))
+        except TimeoutError:
+            # A slow page is previewed from whatever had loaded by the deadline
+            logger.debug(f"Navigation to {url} timed out, previewing the partially loaded page")
+            response = None
+        except PlaywrightError as e:
+            # Navigations that turn into downloads (PDF, DOCX) are read with range requests instead
+            if "Download is starting" not in str(e) and not self.document_previewer.is_document_url(url):
+                raise
 
-    def output_link(self, url, connection, channel):
-        """Handle URL processing in a separate process using Playwright."""
-        domain = urlparse(url)
-        domain = domain.netloc.replace('www.', '')
+            message = self.document_previewer.preview(url)
+
+            if message is None:
+                raise
+
+            return message
+
+        if policy.interact:
+            self.human_like_interaction(page)
+
+        if policy.reload:
+            page.reload(wait_until=policy.wait_until, timeout=self.remaining_ms(deadline))
+
+        content_type = response.headers.get("content-type", "") if response is not None else ""
+
+        if self.document_previewer.is_document_type(content_type):
+            # A document the browser rendered inline; the file name is all the page has
+            return f"[ {os.path.basename(urlparse(url).path) or url} ]"
+
+        actual_url = page.url
+        logger.debug(f"The URL: {actual_url}")
+
+        if "https://www.google.com/url?q=" in actual_url:
+            actual_url = re.sub(r'^https:\/\/www\.google\.com\/url\?q=', '', actual_url)
+            page.goto(actual_url, wait_until=policy.wait_until, timeout=self.remaining_ms(deadline))
+            actual_url = page.url
+
+        if "consent.yahoo.com" in actual_url:
+            try:
+                page.wait_for_selector("//button[contains(@class,'accept-all')]", timeout=self.remaining_ms(deadline))
+                logger.debug("✅ Found Yahoo popup accept cookies button")
+                accept_all_button = page.locator("//button[contains(@class,'accept-all')]")
+
+                with page.expect_navigation(wait_until="domcontentloaded", timeout=self.remaining_ms(deadline)):
+                    page.evaluate('''accept_all_button => {
+                        accept_all_button.click()
+                    }''', accept_all_button.element_handle())
+
+                logger.debug("✅ Clicked Yahoo popup accept cookies button")
+                return f"[ {page.title()} ]"
+            except TimeoutError:
+                logger.debug("Timeout waiting for Yahoo page to redirect.")
+
+        if policy.wait_for_selector:
+            try:
+                page.wait_for_selector(policy.wait_for_selector, timeout=self.remaining_ms(deadline))
+                logger.debug(f"✅ Found {policy.wait_for_selector} for {policy.name} preview")
+            except TimeoutError:
+                logger.debug(f"Timeout waiting for {policy.wait_for_selector} on {url}.")
+                return f"[ {page.title()} ]"
+
+        page_title = page.title()
+        message = policy.extractor(page, url, page_title, deadline)
+
+        if not message:
+            message = f"[ {page_title} ]"
 
+        return message
+
+    def extract_default_title(self, page, url, page_title, deadline):
+        """Page title; only pages that come back as a bot wall get the interaction and reload."""
+        if not self.static_previewer.bot_wall_titles.search(page_title):
+            return f"[ {page_title} ]"
+
+        logger.debug(f"Bot wall on {url}, retrying with interaction")
+
+        try:
+            self.human_like_interaction(page)
+            page.reload(wait_until="load", timeout=self.remaining_ms(deadline))
+        except (PlaywrightError, TimeoutError):
+            logger.debug(f"Timeout reloading {url} past the bot wall.")
+
+        return f"[ {page.title()} ]"
+
+    def extract_x_profile(self, page, url, page_title, deadline):
+        logger.debug(f"The page title: {page_title}")
+        username_wrapper = page.query_selector('[data-testid="UserName"] > div > div > div > div')
+        title = username_wrapper.inner_text() if username_wrapper else page_title
+        return f"[ {title} ]"
+
+    def extract_tweet_preview(self, page, url, page_title, deadline):
+        meta = page.query_selector('meta[property="og:title"]')
+        title = meta.get_attribute("content") if meta else None
+        meta2 = page.query_selector('meta[property="og:description"]')
+        description = meta2.get_attribute("content") if meta2 else None
+
+        if not title:
+            return ""
+
+        logger.debug("✅ Found tweet author")
+        title = title.replace("\r", "").replace("\n", "")
+        title = re.sub(r'\u200b', '', title)
+
+        if description:
+            logger.debug("✅ Found tweet content")
+            description = description.replace("\r", "").replace("\n", "")
+        else:
+            description = "Check the tweet for any attached media."
+
+        return f"[ {title}: {description} ]"
+
+    def extract_bluesky_preview(self, page, url, page_title, deadline):
+        meta = page.query_selector('meta[property="og:title"]')
+        title = meta.get_attribute("content") if meta else None
+        meta2 = page.query_selector('meta[property="og:description"]')
+        description = meta2.get_attribute("content") if meta2 else None
+
+        if not title:
+            return ""
+
+        logger.debug("✅ Found Bluesky post author")
+        title = title.replace("\r", "").replace("\n", "")
+
+        if not description:
+            return f"[ {title}: Check the Bluesky post for any attached media. ]"
+
+        logger.debug("✅ Found Bluesky post content")
+        description = description.replace("\r", "").replace("\n", "")
+        return f"[ {title}: {description} ]"
+
+    def extract_archive_title(self, page, url, page_title, deadline):
+        default_title = re.sub(r'^https:\/\/', '', url)
+        default_title = re.sub(r'\/$', '', default_title)
+
+        try:
+            page.wait_for_function(
+                f"document.title !== '{default_title}'",
+                timeout=self.remaining_ms(deadline)
+            )
+            page_title = page.title()
+        except TimeoutError:
+            logger.debug("Timeout waiting for archive.* title to change.")
+
+        return f"[ {page_title} ]"
+
+    def extract_ft_preview(self, page, url, page_title, deadline):
+        if "Subscribe to read" not in page_title:
+            return f"[ {page_title} ]"
+
+        try:
+            page.wait_for_selector("blockquote", timeout=self.remaining_ms(deadline))
+            logger.debug("✅ Found main blockquote")
+            blockquote = page.query_selector('blockquote')
+            title = blockquote.inner_text() if blockquote else "Subscribe to read"
+            return f"[ {title} ]"
+        except TimeoutError:
+            logger.debug("Timeout waiting for FT blockquote.")
+            return f"[ {page_title} ]"
+
+    def extract_youtube_preview(self, page, url, page_title, deadline):
+        channel_element = page.query_selector('ytd-channel-name a')
+        title = page_title
+
+        if channel_element:
+            logger.debug("✅ Found main channel name element")
+            channel_name = channel_element.inner_text().strip()
+            new_title = re.sub(r"- YouTube$", "- " + channel_name, title)
+
+            if title != new_title:
+                title = new_title
+
+            if title.startswith('-'):
+                title_element = page.query_selector('#title > h1 > yt-formatted-string')
+                title_element_text = title_element.inner_text().strip()
+                title = title_element_text + ' ' + title
+
+        return f"[ {title} ]"
+
+    def extract_instagram_preview(self, page, url, page_title, deadline):
+        img = page.query_selector('img')
+        description = img.get_attribute("alt") if img else None
+        author = page.query_selector('//div[text()="Follow"]/../preceding-sibling::*[1]')
+
+        if author:
+            author = author.inner_text()
+
+        return f"[ {author}: {description} ]"
+
+    # Query parameters that only track the click and never change what the page shows
+    tracking_parameters = {
+        "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+        "_hsenc", "_hsmi", "mkt_tok", "ref_src", "ref_url", "cmpid", "smid", "sref"
+    }
+    host_tracking_parameters = {
+        "fixupx.com": {"s", "t"},
+        "youtube.com": {"si", "feature"},
+        "youtu.be": {"si", "feature"}
+    }
+
+    def rewrite_link(self, url):
+        """Points X/Twitter status links at fixupx, which serves previews without a login wall."""
         if ("twitter.com" in url or re.search("http(?:[s])?://x.com", url) or re.search("^x.com", url) or "xcancel.com" in url) and ("/status/" in url):
             url = re.sub(r"(?:x|twitter|xcancel)\.com", "fixupx.com", url)
             url = re.sub(r"vxfixupx\.com", "fixupx.com", url)
 
-        message = ""
+        return url
 
-        if domain in ["reuters.com"]:
-            try:
-                response = requests.get(url)
-                if response.status_code == 200:
-                    html = response.text
-                    soup = BeautifulSoup(html, "html.parser")
-                    title = soup.find("title").text
-                    message = f"[ {title} ]"
-            except Exception as e:
-                logger.debug(f"Exception fetching Reuters link: {str(e)}")
-                return
-
-        if len(message) > 0:
-            connection.privmsg(channel, f"{message}")
-            return
+    def normalize_preview_url(self, url):
+        """
+        Canonical form of a URL, used only as its preview cache key: no fragment, no tracking
+        parameters, sorted query. The re-encoded query isn't safe to fetch (signed or
+        order-sensitive URLs, bare keys like ?amp), so the original URL is what gets rendered.
+        """
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").replace("www.", "")
+        dropped = self.tracking_parameters | self.host_tracking_parameters.get(host, set())
+        query = sorted(
+            (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_") and key.lower() not in dropped
+        )
+
+        return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or "/", parsed.params, urlencode(query), ""))
+
+    def render_link_preview(self, url):
+        """
+        Builds the preview line for a URL: a site's structured API when it has one, document
+        metadata for PDF / DOCX links, then the static <head>, and only then the browser when those come back empty, walled or the
+        site needs scripts.
+        Returns None when there is nothing worth caching.
+        """
+        message = self.api_previewer.preview(url)
 
-        queue = Queue()
-        process = Process(target=self.run_playwright, args=(url, queue))
-        process.start()
-        process.join(60)  # Wait up to 15 seconds for the process to complete
-        if process.is_alive():
-            process.terminate()
+        if message:
+            return message
+
+        # Once a link is known to be a document, a failed preview is final: the other tiers would only fetch it again
+        if self.document_previewer.handles(url):
+            message = self.document_previewer.preview(url)
+
+            if message is not None:
+                return message or None
+
+        if not self.static_previewer.needs_browser(url):
+            message = self.static_previewer.preview(url)
+
+            if message is not None:
+                return message or None
+
+            logger.debug(f"Static preview unavailable for {url}, escalating to the browser")
+
+        message = self.run_playwright(url, timeout=60)
+        return message.replace("\n", "") or None
+
+    def output_link(self, url, connection, channel):
+        """Handle URL processing; identical links share one cached, single-flight render."""
+        url = self.rewrite_link(url)
+
+        try:
+            message = self.preview_cache.get(self.normalize_preview_url(url), lambda: self.render_link_preview(url))
+        except FuturesTimeoutError:
             logger.debug(f"Timeout processing URL {url}")
             connection.privmsg(channel, f"Timeout processing {url}")
             return
-        message = queue.get()
-        message = message.replace("\n", "")
+        except Exception as e:
+            connection.privmsg(channel, f"Error processing {url}: {str(e)}")
+            return
 
-        try:
-            connection.privmsg(channel, f"{message}")
-        except irc.client.MessageTooLong as e:
-            logger.debug(f"Message too long: {str(e)}")
-            connection.privmsg(channel, f"Message too long: {str(e)}")
+        if not message:
+            return
+
+        connection.privmsg(channel, f"{message}")
+
+    def fan_out(self, items, fetch, deadline=None):
+        """
+        Runs fetch(item) for every item concurrently and returns the results in input order.
+        Items that fail or miss the overall deadline come back as None.
+        """
+        futures = [self.fetch_executor.submit(fetch, item) for item in items]
+        done, not_done = wait(futures, timeout=deadline or self.snapshot_deadline)
+
+        for future in not_done:
+            future.cancel()
+
+        if not_done:
+            logger.debug(f"{len(not_done)} of {len(futures)} fetches missed the {deadline or self.snapshot_deadline}s deadline")
+
+        return [future.result() if future in done and future.exception() is None else None for future in futures]
+
+    def reply_with_snapshot(self, connection, channel, name):
+        """Answers a market command from its latest background snapshot, stamped with when it was taken."""
+        snapshot = self.market_snapshots.get(name)
+
+        if snapshot is None:
+            return
+
+        message, as_of = snapshot
+        connection.privmsg(channel, f"{message} (as of {as_of.strftime('%H:%M %Z')})")
 
     def handle_time(self, connection, sender, message, channel):
         """Handle !time command."""
@@ -675,8 +887,55 @@ class IRCBot(irc.client.SimpleIRCClient):
         self._target_user = target.lower()
         connection.privmsg("NickServ", f"INFO {target}")
 
-    def handle_bond_prices(self, connection, sender, message, channel):
-        """Handle .bond / .bonds / .yield / .yields command."""
+    def fetch_bond_quote(self, bond):
+        """Fetches and formats a single CNBC bond quote for .bonds."""
+        url = f"https://www.cnbc.com/quotes/{quote(bond['index'])}"
+
+        try:
+            response = self.http_client.get(url)
+
+            if response.status_code == 200:
+                fields = cnbc_bond_summary.extract(response.text)
+                price = fields['price']
+                bond_yield = fields['yield']
+                price_at_previous_close = fields['previous_close']
+
+                if not price or not price_at_previous_close or not bond_yield:
+                    return None
+
+                try:
+                    current_price = float(price)
+                    previous_price = float(price_at_previous_close)
+
+                    difference = ((current_price - previous_price) / previous_price) * 100
+                    difference = math.floor(difference * 10 ** 4) / 10 ** 4
+                    relative_change = (str(difference) + '%')
+
+                    if relative_change.startswith('.'):
+                        relative_change = '+0' + relative_change
+                except:
+                    pass
+
+                relative_change_format_start = ""
+                relative_change_format_end = ""
+
+                if '-' in relative_change:
+                    relative_change_format_start = "\x034"
+                    relative_change_format_end = "\x0F"
+                else:
+                    relative_change_format_start = "\x033"
+                    relative_change_format_end = "\x0F"
+
+                return f"{bond['name']}: {price} (Price) {bond_yield} (Yield) {relative_change_format_start}{relative_change}{relative_change_format_end} (Price Change)"
+            else:
+                logger.debug(f"Couldn't fetch bond data for {bond['name']}")
+        except Exception as e:
+            logger.debug(f"Exception querying bond maturity {bond['name']} from {url}")
+
+        return None
+
+    def build_bond_snapshot(self):
+        """Builds the .bonds reply from CNBC Treasury yields."""
 
         bond_indices = [
             {
@@ -701,68 +960,52 @@ class IRCBot(irc.client.SimpleIRCClient):
             }
         ]
 
-        message = ""
+        quotes = self.fan_out(bond_indices, self.fetch_bond_quote)
+        message = " ".join(segment for segment in quotes if segment)
 
-        for bond in bond_indices:
-            url = f"https://www.cnbc.com/quotes/{quote(bond['index'])}"
+        return message
 
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36'
-                }
+    def handle_bond_prices(self, connection, sender, message, channel):
+        """Handle .bond / .bonds / .yield / .yields command."""
+        self.reply_with_snapshot(connection, channel, 'bonds')
 
-                response = requests.get(url, headers=headers)
+    def fetch_oil_quote(self, oil_index):
+        """Fetches and formats a single FT commodity quote for .oil."""
+        url = f"https://markets.ft.com/data/commodities/tearsheet/summary?c={quote_plus(oil_index['index'])}"
 
-                if response.status_code == 200:
-                    html = response.text
-                    soup = BeautifulSoup(html, "html.parser")
-                    price = soup.select('h3.Summary-title + ul > li.Summary-stat:nth-child(5) > span.Summary-value')
-                    bond_yield = soup.select('.QuoteStrip-lastPrice')
-                    price_at_previous_close = soup.select('h3.Summary-title + ul > li.Summary-stat:nth-child(8) > span.Summary-value')
+        try:
+            response = self.http_client.get(url)
 
-                    if len(price) < 1 or len(price_at_previous_close) < 1 or len(bond_yield) < 1:
-                        continue
+            if response.status_code == 200:
+                fields = ft_tearsheet_overview.extract(response.text)
+                price = fields['price']
+                relative_change = fields['change']
 
-                    price = str(price[0].text).strip()
-                    bond_yield = str(bond_yield[0].text).strip()
-                    price_at_previous_close = str(price_at_previous_close[0].text).strip()
+                if not price or not relative_change:
+                    return None
 
-                    try:
-                        current_price = float(price)
-                        previous_price = float(price_at_previous_close)
+                relative_change = relative_change.split('/')[1].strip()
 
-                        difference = ((current_price - previous_price) / previous_price) * 100
-                        difference = math.floor(difference * 10 ** 4) / 10 ** 4
-                        relative_change = (str(difference) + '%')
+                relative_change_format_start = ""
+                relative_change_format_end = ""
 
-                        if relative_change.startswith('.'):
-                            relative_change = '+0' + relative_change
-                    except:
-                        pass
+                if '-' in relative_change:
+                    relative_change_format_start = "\x034"
+                    relative_change_format_end = "\x0F"
+                else:
+                    relative_change_format_start = "\x033"
+                    relative_change_format_end = "\x0F"
 
-                    relative_change_format_start = ""
-                    relative_change_format_end = ""
+                return f"{oil_index['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
+            else:
+                logger.debug(f"Couldn't fetch oil data for {oil_index['name']}")
+        except Exception as e:
+            logger.debug(f"Exception querying oil index {oil_index['name']} from {url}")
 
-                    if '-' in relative_change:
-                        relative_change_format_start = "\x034"
-                        relative_change_format_end = "\x0F"
-                    else:
-                        relative_change_format_start = "\x033"
-                        relative_change_format_end = "\x0F"
-                    
-                    if len(message) < 1:
-                        message += f"{bond['name']}: {price} (Price) {bond_yield} (Yield) {relative_change_format_start}{relative_change}{relative_change_format_end} (Price Change)"
-                    else:
-                        message += f" {bond['name']}: {price} (Price) {bond_yield} (Yield) {relative_change_format_start}{relative_change}{relative_change_format_end} (Price Change)"
-                else:
-                    logger.debug(f"Couldn't fetch bond data for {bond['name']}")
-            except Exception as e:
-                logger.debug(f"Exception querying bond maturity {bond['name']} from {url}")
-            
-        connection.privmsg(channel, message)
+        return None
 
-    def handle_oil_prices(self, connection, sender, message, channel):
-        """Handle .oil command."""
+    def build_oil_snapshot(self):
+        """Builds the .oil reply from FT commodity quotes."""
 
         oil_indices = [
             {
@@ -783,53 +1026,52 @@ class IRCBot(irc.client.SimpleIRCClient):
             },
         ]
 
-        message = ""
+        quotes = self.fan_out(oil_indices, self.fetch_oil_quote)
+        message = " ".join(segment for segment in quotes if segment)
 
-        for oil_index in oil_indices:
-            url = f"https://markets.ft.com/data/commodities/tearsheet/summary?c={quote_plus(oil_index['index'])}"
+        return message
 
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36'
-                }
+    def handle_oil_prices(self, connection, sender, message, channel):
+        """Handle .oil command."""
+        self.reply_with_snapshot(connection, channel, 'oil')
 
-                response = requests.get(url, headers=headers)
+    def fetch_currency_quote(self, currency):
+        """Fetches and formats a single CNBC currency quote for .currency."""
+        url = f"https://www.cnbc.com/quotes/{quote(currency['index'])}"
 
-                if response.status_code == 200:
-                    html = response.text
-                    soup = BeautifulSoup(html, "html.parser")
-                    price = soup.select('.mod-tearsheet-overview__quote__bar > li:first-child .mod-ui-data-list__value')
-                    relative_change = soup.select('.mod-tearsheet-overview__quote__bar > li:nth-child(2) .mod-ui-data-list__value')
+        try:
+            response = self.http_client.get(url)
 
-                    if len(price) < 1 or len(relative_change) < 1:
-                        continue
+            if response.status_code == 200:
+                fields = cnbc_quote_strip.extract(response.text)
+                price = fields['price']
+                relative_change = fields['change']
 
-                    price = str(price[0].text).strip()
-                    relative_change = str(relative_change[0].text).split('/')[1].strip()
+                if not price or not relative_change:
+                    return None
 
-                    relative_change_format_start = ""
-                    relative_change_format_end = ""
+                relative_change = relative_change.replace('(', '').replace(')', '')
 
-                    if '-' in relative_change:
-                        relative_change_format_start = "\x034"
-                        relative_change_format_end = "\x0F"
-                    else:
-                        relative_change_format_start = "\x033"
-                        relative_change_format_end = "\x0F"
-                    
-                    if len(message) < 1:
-                        message += f"{oil_index['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
-                    else:
-                        message += f" {oil_index['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
+                relative_change_format_start = ""
+                relative_change_format_end = ""
+
+                if '-' in relative_change:
+                    relative_change_format_start = "\x034"
+                    relative_change_format_end = "\x0F"
                 else:
-                    logger.debug(f"Couldn't fetch oil data for {oil_index['name']}")
-            except Exception as e:
-                logger.debug(f"Exception querying oil index {oil_index['name']} from {url}")
-            
-        connection.privmsg(channel, message)
+                    relative_change_format_start = "\x033"
+                    relative_change_format_end = "\x0F"
 
-    def handle_currency_prices(self, connection, sender, message, channel):
-        """Handle .currency command."""
+                return f"{currency['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
+            else:
+                logger.debug(f"Couldn't fetch currency pair for {currency['name']}")
+        except Exception as e:
+            logger.debug(f"Exception querying currency pair {currency['name']} from {url}")
+
+        return None
+
+    def build_currency_snapshot(self):
+        """Builds the .currency reply from CNBC FX quotes."""
 
         currencies = [
             {
@@ -866,50 +1108,14 @@ class IRCBot(irc.client.SimpleIRCClient):
             },
         ]
 
-        message = ""
-
-        for currency in currencies:
-            url = f"https://www.cnbc.com/quotes/{quote(currency['index'])}"
-
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36'
-                }
-
-                response = requests.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    html = response.text
-                    soup = BeautifulSoup(html, "html.parser")
-                    price = soup.select('.QuoteStrip-lastPrice')
-                    relative_change = soup.select('.QuoteStrip-lastPriceStripContainer > *:last-child > *:last-child')
-
-                    if len(price) < 1 or len(relative_change) < 1:
-                        continue
-
-                    price = str(price[0].text).strip()
-                    relative_change = str(relative_change[0].text).strip().replace('(', '').replace(')', '')
+        quotes = self.fan_out(currencies, self.fetch_currency_quote)
+        message = " ".join(segment for segment in quotes if segment)
 
-                    relative_change_format_start = ""
-                    relative_change_format_end = ""
+        return message
 
-                    if '-' in relative_change:
-                        relative_change_format_start = "\x034"
-                        relative_change_format_end = "\x0F"
-                    else:
-                        relative_change_format_start = "\x033"
-                        relative_change_format_end = "\x0F"
-                    
-                    if len(message) < 1:
-                        message += f"{currency['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
-                    else:
-                        message += f" {currency['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
-                else:
-                    logger.debug(f"Couldn't fetch currency pair for {currency['name']}")
-            except Exception as e:
-                logger.debug(f"Exception querying currency pair {currency['name']} from {url}")
-            
-        connection.privmsg(channel, message)
+    def handle_currency_prices(self, connection, sender, message, channel):
+        """Handle .currency command."""
+        self.reply_with_snapshot(connection, channel, 'currency')
 
     def handle_crypto_prices(self, connection, sender, message, channel):
         """Handle .crypto command."""
@@ -927,11 +1133,7 @@ class IRCBot(irc.client.SimpleIRCClient):
         url = "https://coinmarketcap.com/"
 
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36'
-            }
-
-            response = requests.get(url, headers=headers)
+            response = self.http_client.get(url)
 
             if response.status_code == 200:
                 tree = html.fromstring(response.text)
@@ -976,8 +1178,18 @@ class IRCBot(irc.client.SimpleIRCClient):
         if re.match("^\$", ticker):
             ticker = re.sub(r"^\$", "", ticker)
 
-        sec_corporate_roster_parser = SECCorporateRosterParser(ticker=ticker, user_agent_email=self.owner_email, GROQ_API_KEY=self.GROQ_API_KEY)
-        final_roster = sec_corporate_roster_parser.run_pipeline()
+        sec_corporate_roster_parser = SECCorporateRosterParser(ticker=ticker, user_agent_email=self.owner_email, GROQ_API_KEY=self.GROQ_API_KEY, http_client=self.http_client, roster_cache=self.roster_cache, ticker_registry=self.sec_ticker_registry, proxy_token_budget=self.proxy_token_budget, groq_budget=self.groq_budget, llm_backends=self.llm_backends)
+
+        try:
+            final_roster = sec_corporate_roster_parser.run_pipeline()
+        except GroqBudgetExceeded as e:
+            if e.retry_after is None:
+                connection.privmsg(channel, f"Error: {e}")
+            else:
+                mins, secs = divmod(int(e.retry_after), 60)
+                connection.privmsg(channel, f"Error: {e} Retry available in {mins:02d}:{secs:02d}.")
+            return
+
         execs = [f"{name} ({title})" for name, title in final_roster["executives"].items()]
         board = [f"{name} ({title})" for name, title in final_roster["board_members"].items()]
         message = f"Executives: {', '.join(execs)}" if len(execs) > 0 else f"No executives found for {ticker.upper()}. Please consult one of the following users: {', '.join(self.admins)}"
@@ -985,6 +1197,22 @@ class IRCBot(irc.client.SimpleIRCClient):
         connection.privmsg(channel, message)
         connection.privmsg(channel, message_2)
 
+    def handle_groq_quota(self, connection, sender, message, channel):
+        """Handle .quota command."""
+        status = self.groq_budget.status()
+        message = (
+            f"Groq capacity: {status['requests_minute']}/{status['requests_per_minute']} requests and "
+            f"{status['tokens_minute']:,}/{status['tokens_per_minute']:,} tokens this minute | "
+            f"{status['requests_day']}/{status['requests_per_day']} requests and "
+            f"{status['tokens_day']:,}/{status['tokens_per_day']:,} tokens today"
+        )
+
+        if status['blocked_for'] > 0:
+            mins, secs = divmod(int(status['blocked_for']), 60)
+            message += f" | Locked for another {mins:02d}:{secs:02d}"
+
+        connection.privmsg(channel, message)
+
     def display_help_prompt(self, connection, sender, message, channel):
         requested_command = re.sub(r"^\.help ", "", message)
         requested_command = re.sub(r"^ ", "", requested_command)
@@ -993,7 +1221,18 @@ class IRCBot(irc.client.SimpleIRCClient):
             if requested_command in list(self.command_handlers.keys()):
                 source_code = inspect.getsource(self.command_handlers[requested_command])
                 source_code = textwrap.dedent(source_code)
-                using_yf = 'yf.' in source_code
+
+                # Snapshot commands build their reply in a registered builder
+                for name in re.findall(r"self\.reply_with_snapshot\(connection, channel, '(\w+)'\)", source_code):
+                    if name in self.market_snapshots.builders:
+                        source_code += "\n" + textwrap.dedent(inspect.getsource(self.market_snapshots.builders[name]))
+
+                # Per-symbol fetchers hold the actual requests for the fan-out commands
+                for fetcher in dict.fromkeys(re.findall(r"self\.(fetch_\w+)", source_code)):
+                    if hasattr(self, fetcher):
+                        source_code += "\n" + textwrap.dedent(inspect.getsource(getattr(self, fetcher)))
+
+                using_yf = 'yf.' in source_code or 'batch_quote_fetcher' in source_code
                 extracted_uris = self.extract_http_method_uris(source_code, using_yf)
 
                 if len(extracted_uris) > 0:
@@ -1015,8 +1254,8 @@ class IRCBot(irc.client.SimpleIRCClient):
         if 'message_2' in locals():
             connection.privmsg(channel, message_2)
 
-    def handle_futures_prices(self, connection, sender, message, channel):
-        """Handle .futures command."""
+    def build_futures_snapshot(self):
+        """Builds the .futures reply from one batched Yahoo quote request."""
 
         futures = [
             {
@@ -1038,16 +1277,20 @@ class IRCBot(irc.client.SimpleIRCClient):
         ]
 
         message = ""
+        symbols = [future['index'] for future in futures]
+
+        # One batched quote request for the whole list, shared through the quote cache
+        records = self.quote_cache.get(tuple(symbols), lambda: self.batch_quote_fetcher.fetch(symbols))
 
         for future in futures:
-            stock = yf.Ticker(future['index'])
-            data = stock.info
-            price = data.get("currentPrice")
+            record = records.get(future['index'])
 
-            if price is None:
-                price = data.get("regularMarketPrice")
+            if record is None or not record["previous_close"]:
+                logger.debug(f"No batch quote returned for {future['index']}")
+                continue
 
-            previous_price = data.get("regularMarketPreviousClose", 0.0)
+            price = record["price"]
+            previous_price = record["previous_close"]
             relative_change = ((price / previous_price) - 1.0) * 100.0
 
             relative_change_percent_symbol = ''
@@ -1072,10 +1315,47 @@ class IRCBot(irc.client.SimpleIRCClient):
                 message += f"{future['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
             else:
                 message += f" {future['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
-        connection.privmsg(channel, message)
 
-    def handle_market_prices(self, connection, sender, message, channel):
-        """Handle .market / .markets command."""
+        return message
+
+    def handle_futures_prices(self, connection, sender, message, channel):
+        """Handle .futures command."""
+        self.reply_with_snapshot(connection, channel, 'futures')
+
+    def fetch_market_quote(self, market_index):
+        """Fetches and formats a single CNBC index quote for .markets."""
+        url = f"https://www.cnbc.com/quotes/{market_index['index']}"
+
+        try:
+            response = self.http_client.get(url)
+
+            if response.status_code == 200:
+                fields = cnbc_quote_strip.extract(response.text)
+                price = fields['price']
+                relative_change = fields['change']
+
+                if not price or not relative_change:
+                    return None
+
+                relative_change = re.sub(r'[()]', '', relative_change)
+                relative_change_format_start = ''
+                relative_change_format_end = ''
+
+                if '+' in relative_change:
+                    relative_change_format_start = "\x033"
+                    relative_change_format_end = "\x0F"
+                else:
+                    relative_change_format_start = "\x034"
+                    relative_change_format_end = "\x0F"
+
+                return f"{market_index['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
+        except Exception as e:
+            logger.debug(f"Exception querying market index {market_index['name']} from {url}")
+
+        return None
+
+    def build_market_snapshot(self):
+        """Builds the .markets reply from CNBC index quotes."""
 
         market_indices = [
             {
@@ -1100,48 +1380,14 @@ class IRCBot(irc.client.SimpleIRCClient):
             }
         ]
 
-        message = ""
+        quotes = self.fan_out(market_indices, self.fetch_market_quote)
+        message = " ".join(segment for segment in quotes if segment)
 
-        for market_index in market_indices:
-            url = f"https://www.cnbc.com/quotes/{market_index['index']}"
+        return message
 
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36'
-                }
-
-                response = requests.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    html = response.text
-                    soup = BeautifulSoup(html, "html.parser")
-                    price = soup.select('.QuoteStrip-lastPrice')
-                    relative_change = soup.select('.QuoteStrip-lastPriceStripContainer > span:last-child > span:last-child')
-
-                    if len(price) < 1 or len(relative_change) < 1:
-                        continue
-
-                    price = str(price[0].text).strip()
-                    relative_change = str(relative_change[0].text).strip()
-                    relative_change = re.sub(r'[()]', '', relative_change)
-                    relative_change_format_start = ''
-                    relative_change_format_end = ''
-
-                    if '+' in relative_change:
-                        relative_change_format_start = "\x033"
-                        relative_change_format_end = "\x0F"
-                    else:
-                        relative_change_format_start = "\x034"
-                        relative_change_format_end = "\x0F"
-                    
-                    if len(message) < 1:
-                        message += f"{market_index['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
-                    else:
-                        message += f" {market_index['name']}: {price} {relative_change_format_start}{relative_change}{relative_change_format_end}"
-            except Exception as e:
-                logger.debug(f"Exception querying market index {market_index['name']} from {url}")
-            
-        connection.privmsg(channel, message)
+    def handle_market_prices(self, connection, sender, message, channel):
+        """Handle .market / .markets command."""
+        self.reply_with_snapshot(connection, channel, 'markets')
 
     def handle_sector_company_listings(self, connection, sender, message, channel):
         """Handle .sector command."""
@@ -1180,86 +1426,14 @@ class IRCBot(irc.client.SimpleIRCClient):
             name = " ".join(str(name).split())
             formatted_lines.append(f"{symbol} ({name})")
 
-        message = " | ".join(formatted_lines[:10])
-
-        if len(message) < 1:
-            message = f"No tickers found for {sector_string}"
-
-        formatted_lines = formatted_lines[10:]
-        message_2 = ''
-        message_3 = ''
-        message_4 = ''
-        message_5 = ''
-        message_6 = ''
-        message_7 = ''
-        message_8 = ''
-        message_9 = ''
-        message_10 = ''
-
-        if len(formatted_lines) > 0:
-            message_2 = " | ".join(formatted_lines[:10])
-            formatted_lines = formatted_lines[10:]
-
-        if len(formatted_lines) > 0:
-            message_3 = " | ".join(formatted_lines[:10])
-            formatted_lines = formatted_lines[10:]
-
-        if len(formatted_lines) > 0:
-            message_4 = " | ".join(formatted_lines[:10])
-            formatted_lines = formatted_lines[10:]
-
-        if len(formatted_lines) > 0:
-            message_5 = " | ".join(formatted_lines[:10])
-            formatted_lines = formatted_lines[10:]
-
-        if len(formatted_lines) > 0:
-            message_6 = " | ".join(formatted_lines[:10])
-            formatted_lines = formatted_lines[10:]
-
-        if len(formatted_lines) > 0:
-            message_7 = " | ".join(formatted_lines[:10])
-            formatted_lines = formatted_lines[10:]
-
-        if len(formatted_lines) > 0:
-            message_8 = " | ".join(formatted_lines[:10])
-            formatted_lines = formatted_lines[10:]
-
-        if len(formatted_lines) > 0:
-            message_9 = " | ".join(formatted_lines[:10])
-            formatted_lines = formatted_lines[10:]
-
-        if len(formatted_lines) > 0:
-            message_10 = " | ".join(formatted_lines[:10])
-            formatted_lines = formatted_lines[10:]
-        
-        connection.privmsg(channel, message)
-
-        if len('message_2') > 0:
-            connection.privmsg(channel, message_2)
-
-        if len('message_3') > 0:
-            connection.privmsg(channel, message_3)
-
-        if len('message_4') > 0:
-            connection.privmsg(channel, message_4)
+        # Ten companies per line, at most ten lines; the outbound queue paces them
+        lines = [" | ".join(formatted_lines[i:i + 10]) for i in range(0, min(len(formatted_lines), 100), 10)]
 
-        if len('message_5') > 0:
-            connection.privmsg(channel, message_5)
+        if not lines:
+            lines = [f"No tickers found for {sector_string}"]
 
-        if len('message_6') > 0:
-            connection.privmsg(channel, message_6)
-
-        if len('message_7') > 0:
-            connection.privmsg(channel, message_7)
-
-        if len('message_8') > 0:
-            connection.privmsg(channel, message_8)
-
-        if len('message_9') > 0:
-            connection.privmsg(channel, message_9)
-
-        if len('message_10') > 0:
-            connection.privmsg(channel, message_10)
+        for line in lines:
+            connection.privmsg(channel, line)
 
     def handle_stock_quote(self, connection, sender, message, channel):
         """Handle !quote / .q command."""
@@ -1271,8 +1445,7 @@ class IRCBot(irc.client.SimpleIRCClient):
         if re.match("^\$", ticker):
             ticker = re.sub(r"^\$", "", ticker)
 
-        stock = yf.Ticker(ticker)
-        data = stock.info
+        data = self.quote_cache.get(ticker.upper(), lambda: yf.Ticker(ticker).info)
 
         if len(data) < 2:
             connection.privmsg(channel, f"Ticker does not exist.")
@@ -1395,75 +1568,20 @@ class IRCBot(irc.client.SimpleIRCClient):
         if re.match("^\$", ticker):
             ticker = re.sub(r"^\$", "", ticker)
 
-        stock = yf.Ticker(ticker)
-
-        data = stock.info
+        data = self.quote_cache.get(ticker.upper(), lambda: yf.Ticker(ticker).info)
 
         if len(data) < 2:
             connection.privmsg(channel, f"Ticker does not exist.")
             return
 
-        summary = data.get("longBusinessSummary", "")
-
-        message = summary.strip()
-        message_2 = ''
-        message_3 = ''
-        message_4 = ''
-        message_5 = ''
-
-        if len(message.encode('utf-8')) > 451:
-            message_2 = message[450:]
-            message_2 = message_2.strip()
-
-            if re.match(r"[-\. ,]", message[-1]) and not re.match(r"[,]", message_2[0]):
-                message = message[:450] + '-'
-            else:
-                message = message[:450]
-
-        if len(message_2.encode('utf-8')) > 451:
-            message_3 = message_2[450:]
-            message_3 = message_3.strip()
-
-            if re.match(r"[-\. !,]", message_2[-1]) and not re.match(r"[,]", message_3[0]):
-                message_2 = message_2[:450] + '-'
-            else:
-                message_2 = message_2[:450]
-
-        if len(message_3.encode('utf-8')) > 451:
-            message_4 = message_3[450:]
-            message_4 = message_4.strip()
-
-            if re.match(r"[-\. !],", message_3[-1]) and not re.match(r"[,]", message_4[0]):
-                message_3 = message_3[:450] + '-'
-            else:
-                message_3 = message_3[:450]
-
-        if len(message_4.encode('utf-8')) > 451:
-            message_5 = message_4[450:]
-            message_5 = message_5.strip()
-
-            if re.match(r"[-\. ,]", message_4[-1]) and not re.match(r"[,]", message_5[0]):
-                message_4 = message_4[:450] + '-'
-            else:
-                message_4 = message_4[:450]
+        message = data.get("longBusinessSummary", "").strip()
 
         if len(message) < 1:
             message = f"No summary found for ticker {ticker.upper()}"
 
+        # The outbound queue packs the summary into as many full lines as it needs
         connection.privmsg(channel, message)
 
-        if len('message_2') > 0:
-            connection.privmsg(channel, message_2)
-
-        if len('message_3') > 0:
-            connection.privmsg(channel, message_3)
-
-        if len('message_4') > 0:
-            connection.privmsg(channel, message_4)
-
-        if len('message_5') > 0:
-            connection.privmsg(channel, message_5)
-
     def handle_conversion(self, connection, sender, message, channel):
         """Handle !convert command."""
         currencies = re.sub(r"^!convert ", "", message)
@@ -1475,7 +1593,7 @@ class IRCBot(irc.client.SimpleIRCClient):
         api_base = f"https://v6.exchangerate-api.com/v6/{access_key}/latest/{first_currency_pair}"
 
         try:
-            response = requests.get(api_base)
+            response = self.http_client.get(api_base)
 
             if response.status_code == 200:
                 data = response.json()